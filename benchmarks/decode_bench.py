@@ -0,0 +1,59 @@
+"""Micro-benchmark: solders decoding path vs the raw JSON fast path.
+
+Run from the repository root:
+
+    python benchmarks/decode_bench.py --count 5000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from solders.rpc.responses import GetTransactionResp
+from mock_rpc import synthetic_result
+from decoder import json_loads, parse_raw_transaction
+from monitor import parse_transaction
+
+def make_response(i):
+    return {"jsonrpc": "2.0", "id": i, "result": synthetic_result(i)}
+
+def solders_path(body: bytes):
+    # What the fetcher did before: stdlib parse, re-serialise for solders, then parse
+    item = json.loads(body)
+    value = GetTransactionResp.from_json(json.dumps(item)).value
+    return parse_transaction(value, value.block_time)
+
+def fast_path(body: bytes):
+    return parse_raw_transaction(json_loads(body)['result'])
+
+def bench(fn, bodies, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for body in bodies:
+            fn(body)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transaction decoding paths")
+    parser.add_argument('--count', type=int, default=2000, help="transactions per run")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per path; the best is reported")
+    args = parser.parse_args()
+
+    bodies = [json.dumps(make_response(i)).encode() for i in range(args.count)]
+    for body in bodies[:50]:
+        assert solders_path(body) == fast_path(body), "decoding paths disagree"
+
+    results = {name: bench(fn, bodies, args.repeat)
+               for name, fn in (("solders", solders_path), ("fast", fast_path))}
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds / args.count * 1e6:8.1f} us/tx  "
+              f"({args.count / seconds:,.0f} tx/s)")
+    print(f" speedup: {results['solders'] / results['fast']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+"""Local mock Solana JSON-RPC server for benchmarks.
+
+Serves ``getSignaturesForAddress`` and ``getTransaction`` (single and batch
+requests) from an in-memory ledger of synthetic or recorded transactions,
+with configurable latency and injected HTTP 429 and 500 answers. Two extra methods
+drive it from a benchmark: ``mock_push`` appends new transactions for a
+wallet and returns the time they were published, and ``mock_stats`` returns
+request counters.
+
+With ``--websocket`` a stand-in of the PubSub websocket is served as well:
+``logsSubscribe``/``accountSubscribe`` subscriptions get a notification for
+every ``mock_push`` to their wallet, and ``mock_disconnect`` drops all
+websocket connections and refuses new ones for a number of seconds.
+
+Run standalone with ``python benchmarks/mock_rpc.py --transactions 1000``;
+benchmarks start it in a subprocess through ``MockRpcProcess`` so its CPU
+use is not counted against the monitor.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import websockets
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+DEFAULT_WALLET = "So11111111111111111111111111111111111111112"
+
+def _pubkey(n: int) -> str:
+    return str(Pubkey.from_bytes((n % 2 ** 256).to_bytes(32, 'big')))
+
+def token_balance(index: int, owner: str, mint: str, amount: int, decimals: int = 6) -> Dict:
+    return {
+        "accountIndex": index,
+        "mint": mint,
+        "owner": owner,
+        "programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+        "uiTokenAmount": {
+            "amount": str(amount),
+            "decimals": decimals,
+            "uiAmount": amount / 10 ** decimals,
+            "uiAmountString": str(amount / 10 ** decimals)
+        }
+    }
+
+def synthetic_result(i: int, wallet: str = DEFAULT_WALLET, accounts: int = 12,
+                     tokens: int = 6, block_time: Optional[int] = None) -> Dict[str, Any]:
+    """A ``getTransaction`` result shaped like a typical swap by ``wallet``."""
+    keys = [wallet] + [_pubkey(i * 131 + k) for k in range(1, accounts)]
+    mints = [keys[-1], keys[-2]]
+    pre = [token_balance(k, wallet, mints[k % 2], 1_000_000 * k) for k in range(1, tokens + 1)]
+    # One account is closed and one is opened, so positions no longer line up
+    post = [token_balance(k, wallet, mints[k % 2], 1_000_000 * k + 12_345 * (i % 1000 + 1))
+            for k in range(2, tokens + 2)]
+    return {
+        "slot": 250_000_000 + i,
+        "blockTime": block_time if block_time is not None else 1_700_000_000 + i,
+        "meta": {
+            "err": None, "fee": 5000,
+            "preBalances": [2_000_000_000 + k for k in range(accounts)],
+            "postBalances": [1_999_995_000 - i] + [2_000_000_000 + k for k in range(1, accounts)],
+            "innerInstructions": [], "logMessages": [f"Program log: step {k}" for k in range(20)],
+            "preTokenBalances": pre, "postTokenBalances": post, "rewards": [],
+            "status": {"Ok": None},
+            "loadedAddresses": {"writable": [], "readonly": []}
+        },
+        "transaction": {
+            "signatures": [str(Signature((i + 1).to_bytes(64, 'big')))],
+            "message": {
+                "accountKeys": keys,
+                "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0,
+                           "numReadonlyUnsignedAccounts": 2},
+                "instructions": [{"programIdIndex": accounts - 1, "accounts": list(range(accounts - 1)),
+                                  "data": "3Bxs4h24hBtQy9rw", "stackHeight": None}],
+                "recentBlockhash": keys[1]
+            }
+        },
+        "version": "legacy"
+    }
+
+class Ledger:
+    """Per-wallet signature lists (oldest first) and the transactions behind them."""
+
+    def __init__(self):
+        self.entries: Dict[str, List[Dict]] = {}
+        self.positions: Dict[str, int] = {}
+        self.results: Dict[str, Dict] = {}
+        self.next_index = 0
+        self.lock = threading.Lock()
+
+    def add_result(self, wallet: str, result: Dict[str, Any]) -> str:
+        signature = result['transaction']['signatures'][0]
+        with self.lock:
+            entries = self.entries.setdefault(wallet, [])
+            self.positions[signature] = len(entries)
+            entries.append({"signature": signature, "slot": result['slot'],
+                            "blockTime": result.get('blockTime')})
+            self.results[signature] = result
+        return signature
+
+    def add_synthetic(self, wallet: str, count: int, block_time: Optional[int] = None) -> List[str]:
+        signatures = []
+        for _ in range(count):
+            self.next_index += 1
+            signatures.append(self.add_result(wallet, synthetic_result(self.next_index, wallet,
+                                                                       block_time=block_time)))
+        return signatures
+
+    def load_recorded(self, path: str, wallet: str) -> int:
+        """Load ``getTransaction`` results (or whole responses) from a JSON lines file."""
+        count = 0
+        with open(path, 'r') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        records = [record.get('result', record) for record in records]
+        for result in sorted((r for r in records if r), key=lambda r: r['slot']):
+            self.add_result(wallet, result)
+            count += 1
+        return count
+
+    def signatures_for(self, wallet: str, options: Dict) -> List[Dict]:
+        with self.lock:
+            entries = self.entries.get(wallet, [])
+            start = len(entries) - 1
+            if options.get('before') in self.positions:
+                start = self.positions[options['before']] - 1
+            stop = -1
+            if options.get('until') in self.positions:
+                stop = self.positions[options['until']]
+            stop = max(stop, start - options.get('limit', 1000))
+            return [dict(entries[i], err=None, memo=None, confirmationStatus="confirmed")
+                    for i in range(start, stop, -1)]
+
+class MockWebsocket:
+    """PubSub websocket stand-in, served from its own thread and event loop.
+
+    ``ack_delay`` holds back subscription results and ``reject`` answers
+    subscribe requests with an error, for testing how clients cope.
+    """
+
+    def __init__(self, port: int = 0, ack_delay: float = 0.0, reject: bool = False):
+        self.port = port
+        self.ack_delay = ack_delay
+        self.reject = reject
+        self.server = None
+        # subscription id -> (connection, wallet, method)
+        self.subscriptions: Dict[int, Tuple[Any, str, str]] = {}
+        self.ids = itertools.count(1)
+        self.connections = 0
+        self.subscribes = 0
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def _start(self):
+        self.server = await websockets.serve(self._handle, '127.0.0.1', self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, connection, *args):
+        self.connections += 1
+        try:
+            async for raw in connection:
+                request = json.loads(raw)
+                method, params = request.get('method'), request.get('params') or []
+                if method in ('logsSubscribe', 'accountSubscribe') and self.reject:
+                    answer = {"jsonrpc": "2.0", "id": request.get('id'),
+                              "error": {"code": -32602, "message": "Invalid params"}}
+                elif method in ('logsSubscribe', 'accountSubscribe'):
+                    if self.ack_delay:
+                        await asyncio.sleep(self.ack_delay)
+                    wallet = params[0]['mentions'][0] if method == 'logsSubscribe' else params[0]
+                    result = next(self.ids)
+                    self.subscriptions[result] = (connection, wallet, method)
+                    self.subscribes += 1
+                    answer = {"jsonrpc": "2.0", "id": request.get('id'), "result": result}
+                elif method in ('logsUnsubscribe', 'accountUnsubscribe'):
+                    result = self.subscriptions.pop(params[0], None) is not None
+                    answer = {"jsonrpc": "2.0", "id": request.get('id'), "result": result}
+                else:
+                    answer = {"jsonrpc": "2.0", "id": request.get('id'),
+                              "error": {"code": -32601, "message": "Method not found"}}
+                await connection.send(json.dumps(answer))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for subscription, (owner, _, _) in list(self.subscriptions.items()):
+                if owner is connection:
+                    del self.subscriptions[subscription]
+
+    async def _notify(self, wallet: str, entries: List[Tuple[str, int]]):
+        for subscription, (connection, sub_wallet, method) in list(self.subscriptions.items()):
+            if sub_wallet != wallet:
+                continue
+            # One log notification per transaction, one account change per push
+            for signature, slot in entries if method == 'logsSubscribe' else entries[-1:]:
+                if method == 'logsSubscribe':
+                    value = {"signature": signature, "err": None, "logs": []}
+                else:
+                    value = {"lamports": 0, "data": ["", "base64"], "owner": "11111111111111111111111111111111",
+                             "executable": False, "rentEpoch": 0}
+                try:
+                    await connection.send(json.dumps({
+                        "jsonrpc": "2.0", "method": method.replace('Subscribe', 'Notification'),
+                        "params": {"result": {"context": {"slot": slot}, "value": value},
+                                   "subscription": subscription}
+                    }))
+                except websockets.ConnectionClosed:
+                    pass
+
+    def notify(self, wallet: str, entries: List[Tuple[str, int]]):
+        """Send notifications for ``(signature, slot)`` pairs just published for ``wallet``."""
+        asyncio.run_coroutine_threadsafe(self._notify(wallet, entries), self.loop).result(timeout=10)
+
+    async def _disconnect(self, seconds: float):
+        self.server.close()
+        await self.server.wait_closed()
+        self.subscriptions.clear()
+        # Same port again, so clients reconnect to the URL they know
+        self.loop.call_later(seconds, lambda: self.loop.create_task(self._start()))
+
+    def disconnect(self, seconds: float):
+        """Drop every connection and refuse new ones for ``seconds``."""
+        asyncio.run_coroutine_threadsafe(self._disconnect(seconds), self.loop).result(timeout=10)
+
+    def close(self):
+        async def stop():
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def stats(self) -> Dict[str, int]:
+        return {"connections": self.connections, "subscribes": self.subscribes,
+                "subscriptions": len(self.subscriptions)}
+
+class MockRpc:
+    def __init__(self, ledger: Ledger, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_ratio: float = 0.0, retry_after: Optional[float] = None, seed: int = 0,
+                 error_ratio: float = 0.0, websocket: Optional[MockWebsocket] = None):
+        self.ledger = ledger
+        self.error_ratio = error_ratio
+        self.errors = 0
+        self.websocket = websocket
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts: Dict[str, int] = {}
+        self.rate_limited = 0
+
+    def handle(self, body: Dict) -> Dict:
+        method = body.get('method')
+        params = body.get('params') or []
+        self.counts[method] = self.counts.get(method, 0) + 1
+        if method == 'getSignaturesForAddress':
+            result = self.ledger.signatures_for(params[0], params[1] if len(params) > 1 else {})
+        elif method == 'getTransaction':
+            result = self.ledger.results.get(params[0])
+        elif method == 'mock_push':
+            wallet, count = params[0], params[1]
+            published = time.time()
+            signatures = self.ledger.add_synthetic(wallet, count, block_time=int(published))
+            if self.websocket is not None:
+                self.websocket.notify(wallet, [(sig, self.ledger.results[sig]['slot']) for sig in signatures])
+            result = {"signatures": signatures, "published": published}
+        elif method == 'mock_disconnect' and self.websocket is not None:
+            self.websocket.disconnect(params[0] if params else 0.0)
+            result = True
+        elif method == 'mock_stats':
+            result = {"counts": self.counts, "rate_limited": self.rate_limited, "errors": self.errors}
+            if self.websocket is not None:
+                result["websocket"] = self.websocket.stats()
+        else:
+            return {"jsonrpc": "2.0", "id": body.get('id'),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": body.get('id'), "result": result}
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                control = not isinstance(body, list) and body.get('method', '').startswith('mock_')
+                if not control:
+                    delay = mock.latency + mock.random.uniform(0, mock.jitter)
+                    if delay:
+                        time.sleep(delay)
+                    if mock.rate_limit_ratio and mock.random.random() < mock.rate_limit_ratio:
+                        mock.rate_limited += 1
+                        self.send_response(429)
+                        if mock.retry_after is not None:
+                            self.send_header('Retry-After', str(mock.retry_after))
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    if mock.error_ratio and mock.random.random() < mock.error_ratio:
+                        mock.errors += 1
+                        self.send_response(500)
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                answer = [mock.handle(b) for b in body] if isinstance(body, list) else mock.handle(body)
+                out = json.dumps(answer).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def serve(ledger: Ledger, port: int = 0, **options) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockRpc(ledger, **options).handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class MockRpcProcess:
+    """Runs the mock server in a subprocess; use as a context manager for its URL.
+
+    With ``websocket`` the websocket stand-in's URL is in ``ws_url`` once entered.
+    """
+
+    def __init__(self, transactions: int = 0, wallet: str = DEFAULT_WALLET, latency: float = 0.0,
+                 jitter: float = 0.0, rate_limit_ratio: float = 0.0,
+                 retry_after: Optional[float] = None, replay: Optional[str] = None,
+                 error_ratio: float = 0.0, websocket: bool = False):
+        self.args = [sys.executable, __file__, '--transactions', str(transactions),
+                     '--wallet', wallet, '--latency', str(latency), '--jitter', str(jitter),
+                     '--rate-limit-ratio', str(rate_limit_ratio), '--error-ratio', str(error_ratio)]
+        if retry_after is not None:
+            self.args += ['--retry-after', str(retry_after)]
+        if replay:
+            self.args += ['--replay', replay]
+        if websocket:
+            self.args += ['--websocket']
+        self.websocket = websocket
+        self.ws_url = None
+        self.process = None
+
+    def __enter__(self) -> str:
+        self.process = subprocess.Popen(self.args, stdout=subprocess.PIPE, text=True)
+        url = self.process.stdout.readline().strip()
+        if self.websocket:
+            self.ws_url = self.process.stdout.readline().strip()
+        return url
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Solana JSON-RPC server")
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--wallet', default=DEFAULT_WALLET)
+    parser.add_argument('--transactions', type=int, default=0, help="synthetic transactions to preload")
+    parser.add_argument('--replay', help="JSON lines file of recorded getTransaction results")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random latency, in seconds")
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument('--retry-after', type=float, default=None, help="Retry-After sent with 429s")
+    parser.add_argument('--error-ratio', type=float, default=0.0, help="fraction answered with HTTP 500")
+    parser.add_argument('--websocket', action='store_true', help="also serve a PubSub websocket stand-in")
+    args = parser.parse_args()
+
+    ledger = Ledger()
+    if args.replay:
+        ledger.load_recorded(args.replay, args.wallet)
+    ledger.add_synthetic(args.wallet, args.transactions)
+    websocket = MockWebsocket() if args.websocket else None
+    server = serve(ledger, args.port, latency=args.latency, jitter=args.jitter,
+                   rate_limit_ratio=args.rate_limit_ratio, retry_after=args.retry_after,
+                   error_ratio=args.error_ratio, websocket=websocket)
+    print(f"http://127.0.0.1:{server.server_port}", flush=True)
+    if websocket is not None:
+        print(websocket.url, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Benchmark suite for the monitor loop, parser, history persistence and summaries.
+
+Every scenario runs at every requested scale in its own subprocess (and its
+own temporary working directory), so memory figures are not skewed by
+earlier runs. Network scenarios talk to ``mock_rpc.py`` running in another
+subprocess. Results are written as JSON; pass two result files to
+``--compare`` to see how the throughput changed between runs.
+
+    python benchmarks/run.py --scales 1000,100000
+    python benchmarks/run.py --scenarios monitor --latency 0.05 --rate-limit-ratio 0.05
+    python benchmarks/run.py --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+SCENARIOS = ['parser', 'parser_solders', 'persistence', 'summary', 'monitor']
+TEMPLATES = 1000
+DAY = 86400
+
+def _templates(count: int = TEMPLATES) -> List[bytes]:
+    from mock_rpc import synthetic_result
+    return [json.dumps({"jsonrpc": "2.0", "id": i, "result": synthetic_result(i)}).encode()
+            for i in range(count)]
+
+def bench_parser(scale: int, options: Dict) -> Dict[str, Any]:
+    from decoder import json_loads, parse_raw_transaction
+    bodies = _templates()
+    started = time.perf_counter()
+    for i in range(scale):
+        parse_raw_transaction(json_loads(bodies[i % TEMPLATES])['result'])
+    return {'seconds': time.perf_counter() - started}
+
+def bench_parser_solders(scale: int, options: Dict) -> Dict[str, Any]:
+    from solders.rpc.responses import GetTransactionResp
+    from monitor import parse_transaction
+    bodies = _templates()
+    started = time.perf_counter()
+    for i in range(scale):
+        # The pre-fast-path route: stdlib parse, re-serialise for solders, parse
+        value = GetTransactionResp.from_json(json.dumps(json.loads(bodies[i % TEMPLATES]))).value
+        parse_transaction(value, value.block_time)
+    return {'seconds': time.perf_counter() - started}
+
+def bench_persistence(scale: int, options: Dict) -> Dict[str, Any]:
+    from decoder import parse_raw_transaction
+    from mock_rpc import synthetic_result
+    from monitor import TransactionHistory
+    template = parse_raw_transaction(synthetic_result(0))
+    history = TransactionHistory()
+    batch_size = options['batch_size']
+    started = time.perf_counter()
+    for offset in range(0, scale, batch_size):
+        history.save_history([
+            dict(template, signature=f"sig{i}", block_time=1_700_000_000 + i, wallet="bench")
+            for i in range(offset, min(scale, offset + batch_size))
+        ])
+    seconds = time.perf_counter() - started
+    history.backend.flush()
+    return {'seconds': seconds, 'db_mb': os.path.getsize(history.backend.filename) / 1024 ** 2}
+
+def _summary_transaction(i: int, now: float, span: float, scale: int) -> Dict[str, Any]:
+    symbol = ('SOL', 'USDC', 'BONK', 'JUP')[i % 4]
+    return {
+        'signature': f"sig{i}",
+        'block_time': now - span * (scale - i) / scale,
+        'transaction_type': ('swap', 'transfer')[i % 2],
+        'total_value_usd': 10.0 + i % 100,
+        'actions': [
+            {'type': 'received', 'token_symbol': symbol, 'amount_change': 1.5, 'value_usd': 10.0},
+            {'type': 'sent', 'token_symbol': 'SOL', 'amount_change': 0.01, 'value_usd': 1.0}
+        ]
+    }
+
+def bench_summary(scale: int, options: Dict) -> Dict[str, Any]:
+    from models import TransactionHistory
+    from storage import SQLiteBackend
+    backend = SQLiteBackend("solana_transaction_history.db")
+    now = time.time()
+    for offset in range(0, scale, 10_000):
+        backend.append([_summary_transaction(i, now, 90 * DAY, scale)
+                        for i in range(offset, min(scale, offset + 10_000))])
+
+    started = time.perf_counter()
+    history = TransactionHistory(backend)
+    load_seconds = time.perf_counter() - started
+
+    timings = {}
+    for days in (1, 7, 30):
+        started = time.perf_counter()
+        for _ in range(10):
+            history.get_summary(days)
+        timings[f"get_summary_{days}d_ms"] = (time.perf_counter() - started) / 10 * 1000
+
+    started = time.perf_counter()
+    history.columnar()
+    columnar_build = time.perf_counter() - started
+    started = time.perf_counter()
+    history.columnar().summary(now - 30 * DAY)
+    return {
+        'seconds': load_seconds,
+        'load_seconds': load_seconds,
+        **timings,
+        'columnar_build_seconds': columnar_build,
+        'columnar_summary_30d_ms': (time.perf_counter() - started) * 1000
+    }
+
+def bench_monitor(scale: int, options: Dict) -> Dict[str, Any]:
+    """Backfill throughput and new-transaction detection latency against the mock."""
+    import asyncio
+    import httpx
+    from mock_rpc import DEFAULT_WALLET, MockRpcProcess
+    from monitor import TransactionMonitor
+
+    network_scale = min(scale, options['max_network'])
+    mock = MockRpcProcess(network_scale, latency=options['latency'], jitter=options['jitter'],
+                          rate_limit_ratio=options['rate_limit_ratio'],
+                          retry_after=options['retry_after'], replay=options['replay'])
+
+    async def run(url: str) -> Dict[str, Any]:
+        monitor = TransactionMonitor(endpoints=[url], max_requests_per_second=options['rps'],
+                                     min_interval=options['poll_interval'], use_batch=options['batch'],
+                                     cache_dir=None)
+        detected: Dict[str, float] = {}
+        monitor.set_transaction_callback(lambda tx: detected.setdefault(tx['signature'], time.time()))
+        try:
+            started = time.perf_counter()
+            stored = await monitor.backfill(DEFAULT_WALLET, workers=options['workers'],
+                                            use_batch=options['batch'])
+            backfill_seconds = time.perf_counter() - started
+
+            await monitor.start_monitoring(DEFAULT_WALLET)
+            published: Dict[str, float] = {}
+            async with httpx.AsyncClient() as client:
+                for i in range(options['pushes']):
+                    response = await client.post(url, json={
+                        "jsonrpc": "2.0", "id": i, "method": "mock_push", "params": [DEFAULT_WALLET, 1]
+                    })
+                    result = response.json()['result']
+                    for signature in result['signatures']:
+                        published[signature] = result['published']
+                    await asyncio.sleep(options['push_interval'])
+                deadline = time.monotonic() + max(5.0, 4 * options['poll_interval'])
+                while len(detected) < len(published) and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                stats = (await client.post(url, json={
+                    "jsonrpc": "2.0", "id": 0, "method": "mock_stats", "params": []
+                })).json()['result']
+        finally:
+            await monitor.close()
+
+        latencies = sorted(detected[sig] - published[sig] for sig in published if sig in detected)
+        return {
+            'network_scale': network_scale,
+            'stored': stored,
+            'seconds': backfill_seconds,
+            'backfill_seconds': backfill_seconds,
+            'detected': len(latencies),
+            'pushed': len(published),
+            'detection_p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+            'detection_p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else None,
+            'detection_max_ms': latencies[-1] * 1000 if latencies else None,
+            'rpc_requests': stats['counts'],
+            'rate_limited': stats['rate_limited']
+        }
+
+    with mock as url:
+        result = asyncio.run(run(url))
+    result['tx_per_s'] = result['stored'] / result['seconds'] if result['seconds'] else None
+    return result
+
+BENCHMARKS = {
+    'parser': bench_parser,
+    'parser_solders': bench_parser_solders,
+    'persistence': bench_persistence,
+    'summary': bench_summary,
+    'monitor': bench_monitor
+}
+
+def run_worker(scenario: str, scale: int, options: Dict) -> Dict[str, Any]:
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    result = BENCHMARKS[scenario](scale, options)
+    result.setdefault('tx_per_s', scale / result['seconds'] if result['seconds'] else None)
+    result.update({
+        'scenario': scenario,
+        'scale': scale,
+        'wall_seconds': time.perf_counter() - wall_started,
+        'cpu_seconds': time.process_time() - cpu_started,
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss /
+                       (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    })
+    return result
+
+def run_suite(args, options: Dict) -> Dict[str, Any]:
+    results = []
+    for scenario in args.scenarios.split(','):
+        for scale in (int(s) for s in args.scales.split(',')):
+            print(f"{scenario} @ {scale:,} ...", end=' ', flush=True, file=sys.stderr)
+            workdir = tempfile.mkdtemp(prefix="bench-")
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', scenario,
+                 '--scale', str(scale), '--options', json.dumps(options)],
+                cwd=workdir, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print("failed", file=sys.stderr)
+                print(completed.stderr[-2000:], file=sys.stderr)
+                results.append({'scenario': scenario, 'scale': scale, 'error': completed.stderr[-2000:]})
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{result['tx_per_s']:,.0f} tx/s, {result['cpu_seconds']:.1f}s CPU, "
+                  f"{result['peak_rss_mb']:.0f} MiB", file=sys.stderr)
+            results.append(result)
+    return {
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': options,
+        'results': results
+    }
+
+def compare(old_file: str, new_file: str):
+    with open(old_file) as f:
+        old = {(r['scenario'], r['scale']): r for r in json.load(f)['results'] if 'error' not in r}
+    with open(new_file) as f:
+        new = {(r['scenario'], r['scale']): r for r in json.load(f)['results'] if 'error' not in r}
+    print(f"{'scenario':<16}{'scale':>10}{'old tx/s':>14}{'new tx/s':>14}{'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]['tx_per_s'], new[key]['tx_per_s']
+        change = f"{(after / before - 1) * 100:+.1f}%" if before and after else "n/a"
+        print(f"{key[0]:<16}{key[1]:>10,}{before or 0:>14,.0f}{after or 0:>14,.0f}{change:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="comma-separated scenarios")
+    parser.add_argument('--scales', default="1000,100000,1000000", help="comma-separated transaction counts")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two result files")
+    parser.add_argument('--latency', type=float, default=0.0, help="mock RPC latency per request, seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random mock latency, seconds")
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help="fraction of 429 answers")
+    parser.add_argument('--retry-after', type=float, default=None, help="Retry-After sent with 429s")
+    parser.add_argument('--replay', help="JSON lines of recorded getTransaction results to serve")
+    parser.add_argument('--max-network', type=int, default=20000,
+                        help="cap on transactions served by the mock in the monitor scenario")
+    parser.add_argument('--rps', type=float, default=1000.0, help="monitor request rate limit")
+    parser.add_argument('--workers', type=int, default=16, help="concurrent backfill fetches")
+    parser.add_argument('--batch', action='store_true', help="use JSON-RPC batches in the monitor scenario")
+    parser.add_argument('--poll-interval', type=float, default=0.5, help="monitor poll interval, seconds")
+    parser.add_argument('--pushes', type=int, default=20, help="transactions pushed to measure detection")
+    parser.add_argument('--push-interval', type=float, default=0.1, help="seconds between pushes")
+    parser.add_argument('--batch-size', type=int, default=1000, help="transactions per history write")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--options', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.worker:
+        # Keep stdout for the result line; the monitor prints progress there
+        real_stdout, sys.stdout = sys.stdout, sys.stderr
+        result = run_worker(args.worker, args.scale, json.loads(args.options))
+        print(json.dumps(result), file=real_stdout)
+        return
+
+    options = {
+        'latency': args.latency, 'jitter': args.jitter, 'rate_limit_ratio': args.rate_limit_ratio,
+        'retry_after': args.retry_after, 'replay': os.path.abspath(args.replay) if args.replay else None,
+        'max_network': args.max_network, 'rps': args.rps, 'workers': args.workers, 'batch': args.batch,
+        'poll_interval': args.poll_interval, 'pushes': args.pushes,
+        'push_interval': args.push_interval, 'batch_size': args.batch_size
+    }
+    report = run_suite(args, options)
+    output = args.output or os.path.join(BENCH_DIR, 'results',
+                                         time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""End-to-end check of push mode against the mock server's websocket stand-in.
+
+Runs a monitor with a websocket URL and poll intervals far longer than the
+check itself, so every transaction it sees must have come through a
+notification or through the backfill on reconnect. Checks that:
+
+1. a notification triggers a poll that stores the pushed transactions,
+2. after the websocket drops, the subscriber reconnects and resubscribes,
+3. transactions published while it was down are backfilled on reconnect,
+4. notifications arrive again on the new subscription.
+
+    python benchmarks/subscriber_check.py
+
+Exits with status 1 if any step fails.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from mock_rpc import DEFAULT_WALLET, MockRpcProcess
+
+# Long enough that no scheduled poll can fall inside the check
+POLL_INTERVAL = 60.0
+DEADLINE = 10.0
+OUTAGE = 2.0
+
+async def _call(client, url: str, method: str, params: list):
+    response = await client.post(url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    return response.json()['result']
+
+async def _wait_for(condition: Callable[[], bool], timeout: float = DEADLINE) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+async def check(url: str, ws_url: str) -> List[str]:
+    import httpx
+    from monitor import TransactionMonitor
+
+    failures = []
+
+    def report(ok: bool, step: str):
+        print(f"{'ok  ' if ok else 'FAIL'} {step}")
+        if not ok:
+            failures.append(step)
+
+    monitor = TransactionMonitor(endpoints=[url], ws_url=ws_url, min_interval=POLL_INTERVAL,
+                                 max_interval=POLL_INTERVAL, cache_dir=None)
+    monitor.subscriptions.reconnect_delay = 0.5
+    detected: Dict[str, float] = {}
+    monitor.set_transaction_callback(lambda tx: detected.setdefault(tx['signature'], time.monotonic()))
+    try:
+        async with httpx.AsyncClient() as client:
+            await monitor.start_monitoring(DEFAULT_WALLET)
+            subscribed = await _wait_for(lambda: monitor.subscriptions.connected
+                                         and monitor.cursors.get(DEFAULT_WALLET) is not None)
+            report(subscribed, "connects, subscribes and sets the cursor")
+            if not subscribed:
+                return failures
+
+            pushed = (await _call(client, url, 'mock_push', [DEFAULT_WALLET, 5]))['signatures']
+            report(await _wait_for(lambda: all(sig in detected for sig in pushed)),
+                   "notification triggers a poll that stores the pushed transactions")
+
+            await _call(client, url, 'mock_disconnect', [OUTAGE])
+            report(await _wait_for(lambda: not monitor.subscriptions.connected),
+                   "notices the dropped connection")
+            # Let the poll run on disconnect finish, so only the backfill can find these
+            await asyncio.sleep(0.5)
+            missed = (await _call(client, url, 'mock_push', [DEFAULT_WALLET, 7]))['signatures']
+            early = any(sig in detected for sig in missed)
+
+            reconnected = await _wait_for(lambda: monitor.subscriptions.connected, OUTAGE + DEADLINE)
+            stats = (await _call(client, url, 'mock_stats', []))['websocket']
+            report(reconnected and stats['connections'] >= 2 and stats['subscriptions'] == 1,
+                   f"reconnects and resubscribes ({stats['connections']} connections, "
+                   f"{stats['subscriptions']} live subscription)")
+            report(not early and await _wait_for(lambda: all(sig in detected for sig in missed)),
+                   "backfills transactions published during the outage")
+
+            after = (await _call(client, url, 'mock_push', [DEFAULT_WALLET, 3]))['signatures']
+            report(await _wait_for(lambda: all(sig in detected for sig in after)),
+                   "notifications arrive on the new subscription")
+    finally:
+        await monitor.close()
+    return failures
+
+def main():
+    # The monitor keeps its history and cursors in the working directory
+    os.chdir(tempfile.mkdtemp(prefix="subscriber-check-"))
+    mock = MockRpcProcess(20, websocket=True)
+    with mock as url:
+        failures = asyncio.run(check(url, mock.ws_url))
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
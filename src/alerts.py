@@ -0,0 +1,207 @@
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+@dataclass
+class Alert:
+    rule: str
+    wallet: Optional[str]
+    signature: str
+    message: str
+    transaction: Dict[str, Any] = field(repr=False, default_factory=dict)
+
+class Rule:
+    """A compiled alert rule.
+
+    ``wallets``/``mint`` restrict which transactions reach the rule at all;
+    the engine indexes rules by them, so ``check`` only sees candidates.
+    """
+
+    def __init__(self, name: str, wallets: Optional[Iterable[str]] = None, mint: Optional[str] = None,
+                 direction: str = "any"):
+        if direction not in ("in", "out", "any"):
+            raise ValueError(f"Rule {name}: direction must be 'in', 'out' or 'any'")
+        self.name = name
+        self.wallets = list(wallets) if wallets else None
+        self.mint = mint
+        self.direction = direction
+
+    def _direction_matches(self, amount: float) -> bool:
+        if self.direction == "in":
+            return amount > 0
+        if self.direction == "out":
+            return amount < 0
+        return amount != 0
+
+    def check(self, tx: Dict[str, Any], wallet: Optional[str], now: float) -> Optional[str]:
+        raise NotImplementedError
+
+class SolDeltaRule(Rule):
+    """SOL balance change of at least ``threshold`` SOL."""
+
+    def __init__(self, name: str, threshold: float, **options):
+        super().__init__(name, **options)
+        self.threshold = threshold
+
+    def check(self, tx, wallet, now):
+        delta = tx.get('sol_transfer') or 0.0
+        if abs(delta) >= self.threshold and self._direction_matches(delta):
+            return f"SOL change of {delta:+.9g} SOL"
+        return None
+
+class MintTransferRule(Rule):
+    """Any transfer of ``mint`` of at least ``min_amount`` tokens."""
+
+    def __init__(self, name: str, mint: str, min_amount: float = 0.0, **options):
+        super().__init__(name, mint=mint, **options)
+        self.min_amount = min_amount
+
+    def check(self, tx, wallet, now):
+        for transfer in tx.get('token_transfers') or ():
+            amount = transfer['amount']
+            if (transfer.get('mint') == self.mint and abs(amount) >= self.min_amount
+                    and self._direction_matches(amount)):
+                return f"Transfer of {amount:+.9g} {transfer.get('symbol') or self.mint}"
+        return None
+
+class TransferCountRule(Rule):
+    """At least ``count`` transfers (of ``mint``, if set) within ``window`` seconds.
+
+    Keeps one deque of timestamps per wallet: each transfer appends one entry
+    and expired entries are popped from the left, so the work per event is
+    amortized O(1). The window restarts after each alert.
+    """
+
+    def __init__(self, name: str, count: int, window: float, direction: str = "out", **options):
+        super().__init__(name, direction=direction, **options)
+        if count < 1 or window <= 0:
+            raise ValueError(f"Rule {name}: count must be at least 1 and window positive")
+        self.count = count
+        self.window = window
+        self.windows: Dict[Optional[str], Deque[float]] = {}
+
+    def _transfers(self, tx: Dict[str, Any], wallet: Optional[str]) -> int:
+        transfers = 0
+        if self.mint is None and self._direction_matches(tx.get('sol_transfer') or 0.0):
+            transfers += 1
+        for transfer in tx.get('token_transfers') or ():
+            if self.mint is not None and transfer.get('mint') != self.mint:
+                continue
+            # Only the wallet's own token accounts count when the owner is known
+            if wallet and transfer.get('owner') and transfer['owner'] != wallet:
+                continue
+            if self._direction_matches(transfer['amount']):
+                transfers += 1
+        return transfers
+
+    def check(self, tx, wallet, now):
+        transfers = self._transfers(tx, wallet)
+        if not transfers:
+            return None
+        timestamps = self.windows.get(wallet)
+        if timestamps is None:
+            timestamps = self.windows[wallet] = deque()
+        timestamps.extend([now] * transfers)
+        cutoff = now - self.window
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+        if len(timestamps) >= self.count:
+            seen = len(timestamps)
+            timestamps.clear()
+            return f"{seen} transfers within {self.window:g}s"
+        return None
+
+RULE_TYPES = {
+    'sol_delta': SolDeltaRule,
+    'mint_transfer': MintTransferRule,
+    'transfer_count': TransferCountRule,
+}
+
+def compile_rule(spec: Dict[str, Any]) -> Rule:
+    """Build a rule from its JSON form, e.g.
+    ``{"name": "whale", "type": "sol_delta", "threshold": 100, "wallets": [...]}``.
+    """
+    options = dict(spec)
+    rule_type = options.pop('type', None)
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown rule type: {rule_type}")
+    options.setdefault('name', rule_type)
+    if 'wallet' in options:
+        options['wallets'] = [options.pop('wallet')]
+    try:
+        return RULE_TYPES[rule_type](**options)
+    except TypeError as e:
+        raise ValueError(f"Invalid rule {options['name']}: {e}")
+
+def load_rules(filename: str) -> List[Dict[str, Any]]:
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+class AlertEngine:
+    """Evaluates alert rules against transactions as they arrive.
+
+    Rules are compiled once and indexed by wallet and then by mint (``None``
+    standing for "any"), so a transaction is only checked against the rules
+    filed under its wallet or no wallet, and under one of its mints or no
+    mint; the cost per transaction follows the number of candidate rules,
+    not the total.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]] = ()):
+        self.rules: List[Rule] = []
+        self.index: Dict[Optional[str], Dict[Optional[str], List[Rule]]] = {}
+        for spec in rules:
+            self.add_rule(compile_rule(spec) if isinstance(spec, dict) else spec)
+
+    def add_rule(self, rule: Rule):
+        self.rules.append(rule)
+        for wallet in rule.wallets or [None]:
+            self.index.setdefault(wallet, {}).setdefault(rule.mint, []).append(rule)
+
+    def candidates(self, tx: Dict[str, Any]) -> List[Rule]:
+        mints = {transfer.get('mint') for transfer in tx.get('token_transfers') or ()}
+        mints.discard(None)
+        rules = []
+        for wallet in (tx.get('wallet'), None) if tx.get('wallet') else (None,):
+            by_mint = self.index.get(wallet)
+            if not by_mint:
+                continue
+            rules.extend(by_mint.get(None, ()))
+            for mint in mints:
+                rules.extend(by_mint.get(mint, ()))
+        return rules
+
+    def evaluate(self, tx: Dict[str, Any]) -> List[Alert]:
+        wallet = tx.get('wallet')
+        now = tx.get('block_time')
+        if now is None:
+            now = time.time()
+        alerts = []
+        for rule in self.candidates(tx):
+            try:
+                message = rule.check(tx, wallet, now)
+            except Exception as e:
+                print(f"Error evaluating alert rule {rule.name}: {e}")
+                continue
+            if message:
+                alerts.append(Alert(rule.name, wallet, tx.get('signature', ''), message, tx))
+        return alerts
+
+    def attach(self, monitor, maxsize: int = 10000):
+        """Evaluate every new transaction of ``monitor`` and publish alerts back to its event bus."""
+        from events import BLOCK, Event
+
+        async def on_events(batch):
+            alerts = []
+            for event in batch:
+                for alert in self.evaluate(event.transaction):
+                    alerts.append(Event("alert", wallet=alert.wallet, transaction=alert.transaction,
+                                        message=f"{alert.rule}: {alert.message}", rule=alert.rule))
+            if alerts:
+                await monitor.events.publish(alerts)
+
+        # Lossless: window rules have to see every transaction
+        return monitor.subscribe("alerts", callback=on_events, policy=BLOCK, maxsize=maxsize,
+                                 kinds=["transaction"])
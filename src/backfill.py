@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+from solders.pubkey import Pubkey
+import metrics
+from fetcher import TransactionFetcher
+from ratelimit import PRIORITY_BACKFILL
+from tx_cache import TransactionCache
+
+class BackfillCheckpoints:
+    """Persists how far back each wallet's backfill has progressed."""
+
+    def __init__(self, filename="backfill_checkpoints.json"):
+        self.filename = filename
+        self.checkpoints: Dict[str, Dict[str, Any]] = {}
+        self.load_checkpoints()
+
+    def load_checkpoints(self):
+        try:
+            with open(self.filename, 'r') as f:
+                self.checkpoints = json.load(f)
+        except FileNotFoundError:
+            self.checkpoints = {}
+        except json.JSONDecodeError as e:
+            print(f"Error loading backfill checkpoints: {e}")
+            self.checkpoints = {}
+
+    def get(self, wallet: str) -> Dict[str, Any]:
+        return self.checkpoints.get(wallet) or {
+            'before': None,
+            'fetched': 0,
+            'failed': [],
+            'complete': False
+        }
+
+    def update(self, wallet: str, state: Dict[str, Any]):
+        self.checkpoints[wallet] = state
+        try:
+            tmp_filename = f"{self.filename}.tmp"
+            with open(tmp_filename, 'w') as f:
+                json.dump(self.checkpoints, f)
+            os.replace(tmp_filename, self.filename)
+        except Exception as e:
+            print(f"Error saving backfill checkpoints: {e}")
+
+class Backfiller:
+    """Loads a wallet's existing history, newest to oldest, resumably.
+
+    Signature pages are walked back with ``before`` cursors (the next page is
+    requested while the current one is being fetched), transactions are
+    fetched by a bounded pool of ``workers`` concurrent requests at backfill
+    priority, and each page is written to history as one bulk batch before
+    the checkpoint moves past it. An interrupted run resumes from the last
+    checkpoint. With ``process_pool`` parsing runs in worker processes.
+    ``parse_batch`` gets the fetched values, raw result dicts when ``raw``.
+    """
+
+    def __init__(self, monitor, parse_batch: Callable[[List[Any]], List[Optional[Dict]]],
+                 workers: int = 8, use_batch: bool = False, process_pool: bool = False,
+                 page_limit: int = 1000, checkpoints: Optional[BackfillCheckpoints] = None,
+                 raw: bool = False, cache: Optional[TransactionCache] = None):
+        self.monitor = monitor
+        self.parse_batch = parse_batch
+        self.fetcher = TransactionFetcher(monitor.pool, max_in_flight=workers,
+                                          use_batch=use_batch, priority=PRIORITY_BACKFILL,
+                                          raw=raw, cache=cache)
+        self.process_pool = process_pool
+        self.page_limit = page_limit
+        self.checkpoints = checkpoints or BackfillCheckpoints()
+
+    async def _parse(self, values: List[Any], executor) -> List[Dict]:
+        items = [value for value in values if value]
+        if executor is None:
+            parsed = self.parse_batch(items)
+        else:
+            loop = asyncio.get_running_loop()
+            # Split into one chunk per core to keep pickling overhead low
+            size = max(1, -(-len(items) // (os.cpu_count() or 1)))
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, self.parse_batch, chunk) for chunk in chunks
+            ))
+            parsed = [tx for chunk in results for tx in chunk]
+        return [tx for tx in parsed if tx]
+
+    async def _store(self, wallet_address: str, values: List[Any], executor) -> int:
+        started = time.perf_counter()
+        parsed = await self._parse(values, executor)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started)
+        for tx in parsed:
+            tx['wallet'] = wallet_address
+        self.monitor.history.save_history(parsed)
+        self.monitor.value_later(parsed)
+        metrics.TRANSACTIONS.inc('backfill', amount=len(parsed))
+        return len(parsed)
+
+    async def run(self, wallet_address: str, max_transactions: Optional[int] = None,
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> int:
+        """Backfill one wallet and return how many transactions were stored."""
+        wallet = self.monitor.wallets.get(wallet_address) or Pubkey.from_string(wallet_address)
+
+        state = self.checkpoints.get(wallet_address)
+        stored = 0
+        executor = None
+        if self.process_pool:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor()
+        try:
+            if state['failed']:
+                values = await self.fetcher.fetch_transactions(state['failed'])
+                state['failed'] = [sig for sig, value in zip(state['failed'], values) if not value]
+                count = await self._store(wallet_address, values, executor)
+                state['fetched'] += count
+                stored += count
+                self.checkpoints.update(wallet_address, state)
+
+            if state['complete']:
+                return stored
+
+            next_page = asyncio.create_task(self.monitor._get_signatures(
+                wallet, self.page_limit, before=state['before'], priority=PRIORITY_BACKFILL
+            ))
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                if not page:
+                    state['complete'] = True
+                    break
+
+                if state['before'] is None and not self.monitor.cursors.get(wallet_address):
+                    # Live monitoring can pick up from the newest backfilled signature
+                    self.monitor.cursors.update(wallet_address, str(page[0].signature), page[0].slot)
+
+                before = str(page[-1].signature)
+                if len(page) == self.page_limit:
+                    next_page = asyncio.create_task(self.monitor._get_signatures(
+                        wallet, self.page_limit, before=before, priority=PRIORITY_BACKFILL
+                    ))
+
+                values = await self.fetcher.fetch_transactions([str(info.signature) for info in page])
+                count = await self._store(wallet_address, values, executor)
+                state['failed'].extend(str(info.signature)
+                                       for info, value in zip(page, values) if not value)
+                state['before'] = before
+                state['fetched'] += count
+                state['complete'] = next_page is None
+                stored += count
+                self.checkpoints.update(wallet_address, state)
+                if progress:
+                    progress(state)
+
+                if max_transactions is not None and stored >= max_transactions:
+                    break
+            if next_page is not None:
+                next_page.cancel()
+            self.checkpoints.update(wallet_address, state)
+            return stored
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill a wallet's transaction history")
+    parser.add_argument('wallet')
+    parser.add_argument('--max', type=int, default=None, help="stop after this many transactions")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent getTransaction calls")
+    parser.add_argument('--batch', action='store_true', help="use JSON-RPC batch requests")
+    parser.add_argument('--processes', action='store_true', help="parse in a process pool")
+    parser.add_argument('--endpoint', action='append', help="RPC endpoint (repeatable)")
+    parser.add_argument('--value', action='store_true', help="add token symbols and USD values")
+    args = parser.parse_args()
+
+    from monitor import TransactionMonitor
+
+    async def run():
+        monitor = TransactionMonitor(endpoints=args.endpoint, valuation=args.value)
+        try:
+            count = await monitor.backfill(
+                args.wallet, max_transactions=args.max, workers=args.workers,
+                use_batch=args.batch, process_pool=args.processes,
+                progress=lambda state: print(f"Backfilled {state['fetched']} transactions")
+            )
+            print(f"Stored {count} transactions")
+        finally:
+            await monitor.close()
+
+    asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
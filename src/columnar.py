@@ -0,0 +1,205 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from storage import transaction_timestamp
+
+# numpy is optional and slow to import, so it is only loaded once a
+# columnar view is actually built
+np = None
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("numpy is required for columnar analytics (pip install numpy)")
+        np = numpy
+    return np
+
+class _Column:
+    """Growable 1-D NumPy array with amortized O(1) appends."""
+
+    def __init__(self, dtype, fill=0):
+        self.data = np.full(1024, fill, dtype=dtype)
+        self.fill = fill
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.full(len(self.data) * 2, self.fill, dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        return self.data[:self.size]
+
+class _Interner:
+    """Maps strings to small consecutive ints and back."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __call__(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+class ColumnarHistory:
+    """Compact column-oriented copy of the history for vectorized analytics.
+
+    Transactions become parallel arrays (timestamp, slot, SOL delta, type
+    code, USD value, wallet id) and their token movements a flattened
+    transfers table pointing back at the transaction row, with mints and
+    types interned to small ints. Both the monitor's ``token_transfers``
+    records and the ``actions`` records used by ``models`` are understood.
+    """
+
+    def __init__(self, transactions: Iterable[Dict] = ()):
+        _load_numpy()
+        self.types = _Interner()
+        self.tokens = _Interner()
+        self.wallets = _Interner()
+        self.symbols: List[str] = []
+
+        self.timestamp = _Column(np.float64, np.nan)
+        self.slot = _Column(np.int64, -1)
+        self.sol_delta = _Column(np.float64)
+        self.type_code = _Column(np.int32)
+        self.value_usd = _Column(np.float64)
+        self.wallet_id = _Column(np.int32, -1)
+
+        self.transfer_row = _Column(np.int64)
+        self.transfer_token = _Column(np.int32)
+        self.transfer_amount = _Column(np.float64)
+        self.transfer_incoming = _Column(np.bool_, False)
+        self.transfer_value_usd = _Column(np.float64)
+
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return self.timestamp.size
+
+    def _token_id(self, key: str, symbol: str) -> int:
+        token_id = self.tokens(key)
+        if token_id == len(self.symbols):
+            self.symbols.append(symbol)
+        return token_id
+
+    def append(self, tx: Dict):
+        row = self.timestamp.size
+        ts = transaction_timestamp(tx)
+        self.timestamp.append(np.nan if ts is None else ts)
+        self.slot.append(tx.get('slot') if tx.get('slot') is not None else -1)
+        self.sol_delta.append(tx.get('sol_transfer', 0) or 0)
+        self.type_code.append(self.types(tx.get('transaction_type') or tx.get('type') or 'Unknown'))
+        self.value_usd.append(float(tx.get('total_value_usd', 0) or 0))
+        self.wallet_id.append(self.wallets(tx['wallet']) if tx.get('wallet') else -1)
+
+        for transfer in tx.get('token_transfers', []):
+            amount = float(transfer.get('amount', 0) or 0)
+            symbol = transfer.get('symbol', 'Unknown')
+            self._append_transfer(row, self._token_id(transfer.get('mint') or symbol, symbol),
+                                  abs(amount), amount > 0, transfer.get('value_usd', 0))
+        for action in tx.get('actions', []):
+            symbol = action.get('token_symbol', 'Unknown')
+            self._append_transfer(row, self._token_id(action.get('mint') or symbol, symbol),
+                                  float(action['amount_change']), action['type'] == 'received',
+                                  action.get('value_usd', 0))
+
+    def _append_transfer(self, row: int, token_id: int, amount: float, incoming: bool, value_usd):
+        self.transfer_row.append(row)
+        self.transfer_token.append(token_id)
+        self.transfer_amount.append(amount)
+        self.transfer_incoming.append(incoming)
+        self.transfer_value_usd.append(float(value_usd or 0))
+
+    def extend(self, transactions: Iterable[Dict]):
+        for tx in transactions:
+            self.append(tx)
+
+    def _row_mask(self, start: Optional[float], end: Optional[float]):
+        timestamps = self.timestamp.view()
+        mask = ~np.isnan(timestamps)
+        if start is not None:
+            mask &= timestamps > start
+        if end is not None:
+            mask &= timestamps <= end
+        return mask
+
+    def _token_totals(self, row_mask) -> Tuple:
+        """Per-token total_in, total_out, volume_usd and transfer count arrays for the selected rows."""
+        selected = row_mask[self.transfer_row.view()]
+        tokens = self.transfer_token.view()[selected]
+        amounts = self.transfer_amount.view()[selected]
+        incoming = self.transfer_incoming.view()[selected]
+        values = self.transfer_value_usd.view()[selected]
+        size = len(self.tokens.values)
+        total_in = np.bincount(tokens, weights=np.where(incoming, amounts, 0), minlength=size)
+        total_out = np.bincount(tokens, weights=np.where(incoming, 0, amounts), minlength=size)
+        volume = np.bincount(tokens, weights=values, minlength=size)
+        counts = np.bincount(tokens, minlength=size)
+        return total_in, total_out, volume, counts
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+        """Summary of ``start < timestamp <= end`` in the shape of ``get_summary``."""
+        mask = self._row_mask(start, end)
+        type_counts = np.bincount(self.type_code.view()[mask], minlength=len(self.types.values))
+        total_in, total_out, volume, counts = self._token_totals(mask)
+
+        tokens = {}
+        for token_id in np.nonzero(counts)[0]:
+            token = tokens.setdefault(self.symbols[token_id], {
+                'total_in': 0,
+                'total_out': 0,
+                'volume_usd': 0
+            })
+            token['total_in'] += float(total_in[token_id])
+            token['total_out'] += float(total_out[token_id])
+            token['volume_usd'] += float(volume[token_id])
+
+        return {
+            'total_transactions': int(mask.sum()),
+            'total_volume_usd': float(self.value_usd.view()[mask].sum()),
+            'tokens': tokens,
+            'transaction_types': {self.types.values[code]: int(count)
+                                  for code, count in enumerate(type_counts) if count}
+        }
+
+    def mint_volume(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Dict]:
+        """Per-mint transfer count, amounts in/out and USD volume."""
+        total_in, total_out, volume, counts = self._token_totals(self._row_mask(start, end))
+        return {
+            self.tokens.values[token_id]: {
+                'symbol': self.symbols[token_id],
+                'transfers': int(counts[token_id]),
+                'total_in': float(total_in[token_id]),
+                'total_out': float(total_out[token_id]),
+                'volume_usd': float(volume[token_id])
+            }
+            for token_id in np.nonzero(counts)[0]
+        }
+
+    def series(self, bucket_seconds: float, start: float, end: float, field: str = 'count'):
+        """Time-bucketed totals of ``field`` over ``start < timestamp <= end``.
+
+        ``field`` is one of ``count``, ``sol_delta`` or ``value_usd``. Returns
+        the bucket start times and the per-bucket values as arrays.
+        """
+        mask = self._row_mask(start, end)
+        timestamps = self.timestamp.view()[mask]
+        size = int(np.ceil((end - start) / bucket_seconds))
+        # A timestamp exactly on ``end`` belongs to the last bucket
+        buckets = np.minimum((timestamps - start) // bucket_seconds, size - 1).astype(np.int64)
+        weights = None
+        if field == 'sol_delta':
+            weights = self.sol_delta.view()[mask]
+        elif field == 'value_usd':
+            weights = self.value_usd.view()[mask]
+        elif field != 'count':
+            raise ValueError(f"Unknown series field: {field}")
+        values = np.bincount(buckets, weights=weights, minlength=size)[:size]
+        return start + np.arange(size) * bucket_seconds, values
@@ -0,0 +1,170 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import signal
+import sys
+from typing import Any, Dict, List, Optional, TextIO
+
+# Only the standard library is imported at module level; the monitor (and
+# with it solders, httpx and asyncio) is loaded once the arguments are known,
+# and neither GUI toolkit is ever imported.
+
+# Config keys passed straight through to TransactionMonitor
+MONITOR_OPTIONS = (
+    'endpoints', 'ws_url', 'account_updates', 'max_requests_per_second',
+    'method_rates', 'min_interval', 'max_interval', 'max_concurrency',
+    'max_in_flight', 'use_batch', 'hedge', 'valuation'
+)
+
+class JsonLinesSink:
+    """Writes one JSON object per line to stdout or an append-only file."""
+
+    def __init__(self, target: str = "-"):
+        self.target = target
+        self.stream: TextIO = sys.stdout if target == "-" else open(target, 'a')
+        self.encoder = None
+
+    def write(self, event: Dict[str, Any]):
+        self.write_many([event])
+
+    def write_many(self, events: List[Dict[str, Any]]):
+        if self.encoder is None:
+            from monitor import TransactionEncoder
+            self.encoder = TransactionEncoder()
+        try:
+            self.stream.write("".join(self.encoder.encode(event) + "\n" for event in events))
+            # Flush per batch so tailing consumers see events immediately
+            self.stream.flush()
+        except Exception as e:
+            print(f"Error writing event: {e}", file=sys.stderr)
+
+    def close(self):
+        if self.target != "-":
+            self.stream.close()
+
+def load_config(filename: Optional[str]) -> Dict[str, Any]:
+    if not filename:
+        return {}
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error loading config {filename}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+async def run(config: Dict[str, Any], sink: JsonLinesSink, report_startup: bool = True):
+    import asyncio
+    from monitor import TransactionMonitor
+
+    import metrics
+
+    metrics_server = metrics_logger = None
+    if config.get('metrics_port') is not None or config.get('metrics_log_interval'):
+        metrics.enable()
+    if config.get('metrics_port') is not None:
+        metrics_server = metrics.MetricsServer(config['metrics_port'])
+        print(f"Serving metrics on http://127.0.0.1:{metrics_server.port}/metrics", file=sys.stderr)
+    if config.get('metrics_log_interval'):
+        metrics_logger = metrics.MetricsLogger(config['metrics_log_interval'])
+
+    alert_engine = None
+    if config.get('alerts'):
+        from alerts import AlertEngine, load_rules
+        rules = config['alerts']
+        try:
+            alert_engine = AlertEngine(load_rules(rules) if isinstance(rules, str) else rules)
+        except (OSError, ValueError) as e:
+            print(f"Error loading alert rules: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Loaded {len(alert_engine.rules)} alert rule(s)", file=sys.stderr)
+
+    monitor = TransactionMonitor(**{key: config[key] for key in MONITOR_OPTIONS if key in config})
+    from events import BLOCK
+
+    def record(event) -> Dict[str, Any]:
+        if event.kind == 'transaction':
+            return {'event': 'transaction', **event.transaction}
+        if event.kind == 'alert':
+            return {'event': 'alert', 'rule': event.rule, 'wallet': event.wallet,
+                    'signature': event.transaction.get('signature'), 'message': event.message}
+        return {'event': 'error', 'wallet': event.wallet, 'message': event.message}
+
+    def write_events(batch):
+        sink.write_many([record(event) for event in batch])
+
+    # The sink is the daemon's only output, so it is lossless: when it falls
+    # 10000 events behind, polling waits for it
+    monitor.subscribe("sink", callback=write_events, policy=BLOCK, maxsize=10000)
+    if alert_engine:
+        alert_engine.attach(monitor)
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopped.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows; Ctrl+C still ends the run through KeyboardInterrupt
+
+    if report_startup:
+        # Time from process start until the first RPC call can be issued
+        print(f"Ready in {(time.perf_counter() - _STARTED) * 1000:.0f} ms, "
+              f"monitoring {len(config['wallets'])} wallet(s)", file=sys.stderr)
+    try:
+        await monitor.start_monitoring(*config['wallets'])
+        await stopped.wait()
+    finally:
+        await monitor.close()
+        if metrics_server:
+            metrics_server.close()
+        if metrics_logger:
+            metrics_logger.stop()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monitor wallets without a GUI and stream new transactions as JSON lines"
+    )
+    parser.add_argument('--config', help="JSON file with wallets, endpoints, ws_url, sink and rate settings")
+    parser.add_argument('--wallet', action='append', default=[], help="wallet to monitor (repeatable)")
+    parser.add_argument('--endpoint', action='append', help="RPC endpoint (repeatable)")
+    parser.add_argument('--ws-url', help="websocket endpoint for push notifications")
+    parser.add_argument('--sink', help="output file for events, '-' for stdout (default)")
+    parser.add_argument('--alerts', help="JSON file with alert rules")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this local port")
+    parser.add_argument('--metrics-interval', type=float, help="log a metrics summary every N seconds")
+    parser.add_argument('--quiet', action='store_true', help="do not report startup time")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    config['wallets'] = list(config.get('wallets', [])) + args.wallet
+    if args.endpoint:
+        config['endpoints'] = args.endpoint
+    if args.ws_url:
+        config['ws_url'] = args.ws_url
+    if args.alerts:
+        config['alerts'] = args.alerts
+    if args.metrics_port is not None:
+        config['metrics_port'] = args.metrics_port
+    if args.metrics_interval:
+        config['metrics_log_interval'] = args.metrics_interval
+    if not config['wallets']:
+        parser.error("no wallets given (use --wallet or a config file)")
+
+    sink = JsonLinesSink(args.sink or config.get('sink', '-'))
+    if sink.target == "-":
+        # The sink keeps the real stdout; the monitor's status prints go to stderr
+        sys.stdout = sys.stderr
+
+    import asyncio
+    try:
+        asyncio.run(run(config, sink, report_startup=not args.quiet))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+
+if __name__ == '__main__':
+    main()
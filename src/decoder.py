@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # orjson only speeds decoding up; the stdlib parser works too
+    import json
+
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+LAMPORTS_PER_SOL = 10 ** 9
+
+# (account_index, mint, owner, raw amount, decimals)
+TokenBalance = Tuple[int, str, str, int, int]
+
+def build_transaction(signature: str, block_time: Optional[int], slot: int,
+                      pre_balances: List[int], post_balances: List[int],
+                      pre_tokens: Iterable[TokenBalance],
+                      post_tokens: Iterable[TokenBalance]) -> Dict[str, Any]:
+    """The monitor's transaction dict, built from the few fields it uses.
+
+    Token balances are paired by account index rather than by position, so
+    token accounts opened or closed by the transaction count from or to zero.
+    Amounts are compared as raw integers; ``amount`` is derived from them.
+    """
+    parsed_tx = {
+        'signature': signature,
+        'timestamp': datetime.fromtimestamp(block_time, tz=timezone.utc).isoformat()
+                     if block_time is not None else None,
+        'block_time': block_time,
+        'slot': slot,
+        'token_transfers': [],
+        'type': 'unknown'
+    }
+
+    if pre_balances and post_balances:
+        lamports = post_balances[0] - pre_balances[0]
+        if lamports != 0:
+            parsed_tx['sol_transfer'] = lamports / LAMPORTS_PER_SOL
+            parsed_tx['lamports'] = lamports
+            parsed_tx['type'] = 'sol_transfer'
+
+    pre_by_index = {balance[0]: balance for balance in pre_tokens}
+    post_by_index = {balance[0]: balance for balance in post_tokens}
+    for account_index in sorted(pre_by_index.keys() | post_by_index.keys()):
+        pre = pre_by_index.get(account_index)
+        post = post_by_index.get(account_index)
+        _, mint, owner, _, decimals = post or pre
+        raw_amount = (post[3] if post else 0) - (pre[3] if pre else 0)
+        if raw_amount != 0:
+            parsed_tx['token_transfers'].append({
+                'amount': raw_amount / 10 ** decimals,
+                'raw_amount': raw_amount,
+                'decimals': decimals,
+                'mint': mint,
+                'owner': owner
+            })
+            parsed_tx['type'] = 'token_transfer'
+
+    return parsed_tx
+
+def _raw_token_balances(balances: Optional[List[Dict]]) -> List[TokenBalance]:
+    return [
+        (balance['accountIndex'], balance['mint'], balance.get('owner', ''),
+         int(balance['uiTokenAmount']['amount']), balance['uiTokenAmount']['decimals'])
+        for balance in balances or ()
+    ]
+
+def parse_raw_transaction(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Parse a raw ``getTransaction`` result (``json`` encoding) without solders."""
+    try:
+        meta = result.get('meta') or {}
+        return build_transaction(
+            result['transaction']['signatures'][0],
+            result.get('blockTime'),
+            result['slot'],
+            meta.get('preBalances'),
+            meta.get('postBalances'),
+            _raw_token_balances(meta.get('preTokenBalances')),
+            _raw_token_balances(meta.get('postTokenBalances'))
+        )
+    except Exception as e:
+        print(f"Error parsing transaction: {e}")
+        return None
+
+def parse_raw_transactions(results: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Batch variant of ``parse_raw_transaction``; module level so a process pool can run it."""
+    return [parse_raw_transaction(result) for result in results]
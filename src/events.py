@@ -0,0 +1,197 @@
+import asyncio
+import inspect
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set
+import metrics
+
+# Overflow policies for a full subscriber queue
+BLOCK = "block"              # the publisher waits for room (lossless, applies backpressure)
+DROP_OLDEST = "drop_oldest"  # the oldest queued event is discarded
+COALESCE = "coalesce"        # a queued event with the same key is replaced by the new one
+
+@dataclass
+class Event:
+    kind: str                          # "transaction", "error" or "alert"
+    wallet: Optional[str] = None
+    transaction: Optional[Dict[str, Any]] = None
+    message: Optional[str] = None
+    rule: Optional[str] = None         # alert rule name
+    mints: FrozenSet[str] = frozenset()
+    created: float = field(default_factory=time.time)
+
+def transaction_event(tx: Dict[str, Any]) -> Event:
+    mints = frozenset(transfer['mint'] for transfer in tx.get('token_transfers') or ()
+                      if transfer.get('mint'))
+    return Event("transaction", wallet=tx.get('wallet'), transaction=tx, mints=mints)
+
+def default_key(event: Event) -> Hashable:
+    return (event.kind, event.wallet)
+
+class Subscription:
+    """One subscriber's bounded queue, filter and overflow policy."""
+
+    def __init__(self, bus: 'EventBus', name: str, maxsize: int = 1000, policy: str = DROP_OLDEST,
+                 wallets: Optional[Iterable[str]] = None, mints: Optional[Iterable[str]] = None,
+                 kinds: Optional[Iterable[str]] = None,
+                 key: Callable[[Event], Hashable] = default_key,
+                 callback: Optional[Callable[[List[Event]], Any]] = None, batch_size: int = 100):
+        if policy not in (BLOCK, DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.bus = bus
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.wallets: Optional[Set[str]] = set(wallets) if wallets is not None else None
+        self.mints: Optional[Set[str]] = set(mints) if mints is not None else None
+        self.kinds: Optional[Set[str]] = set(kinds) if kinds is not None else None
+        self.key = key
+        self.callback = callback
+        self.batch_size = batch_size
+        self.queue = OrderedDict() if policy == COALESCE else deque()
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def matches(self, event: Event) -> bool:
+        if self.kinds is not None and event.kind not in self.kinds:
+            return False
+        # Errors without a wallet reach every subscriber that takes errors
+        if self.wallets is not None and event.wallet is not None and event.wallet not in self.wallets:
+            return False
+        if self.mints is not None and event.kind == "transaction" and not (event.mints & self.mints):
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    async def put(self, event: Event):
+        if self.policy == COALESCE:
+            key = self.key(event)
+            if key in self.queue:
+                self.queue[key] = event
+                self.coalesced += 1
+                return
+            if len(self.queue) >= self.maxsize:
+                self.queue.popitem(last=False)
+                self.dropped += 1
+            self.queue[key] = event
+        elif self.policy == DROP_OLDEST:
+            if len(self.queue) >= self.maxsize:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append(event)
+        else:
+            while len(self.queue) >= self.maxsize and not self.closed:
+                self.not_full.clear()
+                await self.not_full.wait()
+            if self.closed:
+                return
+            self.queue.append(event)
+        self.not_empty.set()
+
+    def _take(self, count: int) -> List[Event]:
+        batch = []
+        while self.queue and len(batch) < count:
+            if self.policy == COALESCE:
+                batch.append(self.queue.popitem(last=False)[1])
+            else:
+                batch.append(self.queue.popleft())
+        if not self.queue:
+            self.not_empty.clear()
+        self.not_full.set()
+        return batch
+
+    async def get_batch(self, max_items: Optional[int] = None) -> List[Event]:
+        """Wait for at least one event and return up to ``max_items`` queued ones.
+
+        Returns an empty list once the subscription is closed and drained.
+        """
+        while not self.queue:
+            if self.closed:
+                return []
+            await self.not_empty.wait()
+        return self._take(max_items or self.batch_size)
+
+    async def get(self) -> Optional[Event]:
+        batch = await self.get_batch(1)
+        return batch[0] if batch else None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[Event]:
+        batch = await self.get_batch()
+        if not batch:
+            raise StopAsyncIteration
+        return batch
+
+    async def _consume(self):
+        async for batch in self:
+            try:
+                result = self.callback(batch)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error in event subscriber {self.name}: {e}")
+
+    def close(self):
+        self.closed = True
+        self.not_empty.set()
+        self.not_full.set()
+
+class EventBus:
+    """In-process pub/sub for monitor events.
+
+    Each subscriber has its own bounded queue, so a slow consumer only ever
+    fills its own queue; what happens then is its overflow policy. Only
+    ``BLOCK`` subscribers can make ``publish`` wait. Subscribers read batches
+    with ``get_batch``/``async for``, or pass a ``callback`` that is run with
+    each batch from its own task.
+    """
+
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+
+    def subscribe(self, name: str = "subscriber", **options) -> Subscription:
+        subscription = Subscription(self, name, **options)
+        self.subscriptions.append(subscription)
+        metrics.QUEUE_DEPTH.set_function(lambda: len(subscription), f"events:{name}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        subscription.close()
+        metrics.QUEUE_DEPTH.functions.pop((f"events:{subscription.name}",), None)
+
+    def _start_consumers(self):
+        # Callback consumers start lazily, as subscribing may happen before
+        # the event loop runs
+        for subscription in self.subscriptions:
+            if subscription.callback and subscription.task is None:
+                subscription.task = asyncio.get_running_loop().create_task(subscription._consume())
+
+    async def publish(self, events: Iterable[Event]):
+        self._start_consumers()
+        for event in events:
+            for subscription in list(self.subscriptions):
+                if subscription.matches(event):
+                    await subscription.put(event)
+
+    async def close(self):
+        """Close all subscriptions and let callback consumers drain their queues."""
+        tasks = []
+        for subscription in list(self.subscriptions):
+            subscription.close()
+            if subscription.task is not None:
+                tasks.append(subscription.task)
+        if tasks:
+            await asyncio.wait(tasks, timeout=5.0)
+        self.subscriptions.clear()
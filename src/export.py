@@ -0,0 +1,256 @@
+import argparse
+import csv
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from storage import HistoryBackend, SQLiteBackend
+
+# pyarrow is optional and only needed for Parquet output
+pa = None
+pq = None
+
+def _load_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("pyarrow is required for Parquet export (pip install pyarrow)")
+        pa, pq = pyarrow, pyarrow.parquet
+    return pa
+
+TRANSACTION_COLUMNS: List[Tuple[str, type]] = [
+    ('signature', str), ('wallet', str), ('block_time', int), ('timestamp', str), ('slot', int),
+    ('type', str), ('sol_transfer', float), ('lamports', int), ('total_value_usd', float),
+    ('transfer_count', int)
+]
+# One row per token transfer; raw_amount is text as u64 amounts can exceed int64
+TRANSFER_COLUMNS: List[Tuple[str, type]] = [
+    ('signature', str), ('wallet', str), ('block_time', int), ('transfer_index', int),
+    ('mint', str), ('owner', str), ('symbol', str), ('amount', float), ('raw_amount', str),
+    ('decimals', int), ('value_usd', float)
+]
+
+STATE_FILE = "export_state.json"
+
+def flatten(tx: Dict[str, Any], transactions: List[tuple], transfers: List[tuple]):
+    """Append one transaction row, and a row per token transfer, in column order."""
+    get = tx.get
+    token_transfers = get('token_transfers') or ()
+    signature = str(get('signature', ''))
+    wallet = get('wallet')
+    block_time = get('block_time')
+    transactions.append((signature, wallet, block_time, get('timestamp'), get('slot'), get('type'),
+                         get('sol_transfer'), get('lamports'), get('total_value_usd'),
+                         len(token_transfers)))
+    for index, transfer in enumerate(token_transfers):
+        raw_amount = transfer.get('raw_amount')
+        transfers.append((signature, wallet, block_time, index, transfer.get('mint'),
+                          transfer.get('owner'), transfer.get('symbol'), transfer.get('amount'),
+                          str(raw_amount) if raw_amount is not None else None,
+                          transfer.get('decimals'), transfer.get('value_usd')))
+
+class CsvTable:
+    """Appends row chunks to ``<name>.csv``, writing the header once."""
+
+    def __init__(self, directory: str, name: str, columns):
+        self.path = os.path.join(directory, f"{name}.csv")
+        self.columns = [column for column, _ in columns]
+        self.file = None
+        self.writer = None
+
+    def prepare(self, size: Optional[int], position: int):
+        """Start over when ``size`` is None, else drop anything written after ``size``
+        bytes, e.g. by an interrupted export."""
+        if not os.path.exists(self.path):
+            return
+        if size is None:
+            os.remove(self.path)
+        elif os.path.getsize(self.path) > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+
+    def write(self, rows: List[tuple]):
+        if self.writer is None:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self.file = open(self.path, 'a', newline='')
+            self.writer = csv.writer(self.file)
+            if new:
+                self.writer.writerow(self.columns)
+        self.writer.writerows(rows)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = self.writer = None
+
+class ParquetTable:
+    """Writes each export run as one new part file in the ``<name>/`` dataset directory.
+
+    Every chunk becomes a row group. Parts are named after the position they
+    start from and written under a temporary name until closed, so rerunning
+    an interrupted export replaces its part instead of duplicating rows.
+    """
+
+    TYPES = {str: 'string', int: 'int64', float: 'float64'}
+
+    def __init__(self, directory: str, name: str, columns):
+        _load_pyarrow()
+        self.directory = os.path.join(directory, name)
+        self.columns = [column for column, _ in columns]
+        self.schema = pa.schema([(column, getattr(pa, self.TYPES[kind])()) for column, kind in columns])
+        self.writer = None
+        self.path = None
+
+    def prepare(self, size: Optional[int], position: int):
+        for entry in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if size is None or entry.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, entry))
+        self.path = os.path.join(self.directory, f"part-{position + 1:012d}.parquet")
+
+    def write(self, rows: List[tuple]):
+        if not rows:
+            return
+        if self.writer is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.writer = pq.ParquetWriter(self.path + ".tmp", self.schema, compression='zstd')
+        columns = dict(zip(self.columns, map(list, zip(*rows))))
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def size(self) -> int:
+        return 0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.path + ".tmp", self.path)
+            self.writer = None
+
+FORMATS = {'csv': CsvTable, 'parquet': ParquetTable}
+
+def _load_state(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, STATE_FILE), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _save_state(directory: str, state: Dict[str, Any]):
+    path = os.path.join(directory, STATE_FILE)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def export_history(backend: HistoryBackend, directory: str, format: str = 'parquet',
+                   start: Optional[float] = None, end: Optional[float] = None,
+                   wallets: Optional[Sequence[str]] = None, incremental: bool = True,
+                   chunk_size: int = 50_000, progress: Optional[Callable[[int], None]] = None) -> int:
+    """Export the history as a transactions table and a flattened transfers table.
+
+    Rows are streamed from the backend with the time and wallet filters
+    applied by the store, and written ``chunk_size`` transactions at a time,
+    so memory use does not grow with the history. With ``incremental`` the
+    export resumes after the last exported store version recorded in the
+    output directory and only appends rows written since: new transactions,
+    and ones rewritten since the last run (e.g. valued later or reparsed).
+    A rewritten transaction is then in the output twice, and its later rows
+    (in file order, and in part order for Parquet) supersede the earlier
+    ones. Pass ``incremental=False`` to rewrite the export from scratch.
+    Returns the number of transactions written.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    os.makedirs(directory, exist_ok=True)
+    filters = {'start': start, 'end': end, 'wallets': sorted(wallets) if wallets else None}
+    tables = [FORMATS[format](directory, 'transactions', TRANSACTION_COLUMNS),
+              FORMATS[format](directory, 'transfers', TRANSFER_COLUMNS)]
+
+    state = _load_state(directory) if incremental else None
+    if state is not None:
+        if state['format'] != format or state['filters'] != filters:
+            raise ValueError(f"{directory} holds a {state['format']} export with filters "
+                             f"{state['filters']}; use the same settings or a full export")
+        position = state['position']
+        sizes = state['sizes']
+    else:
+        position = 0
+        sizes = [None, None]
+    for table, size in zip(tables, sizes):
+        table.prepare(size, position)
+
+    exported = 0
+    transactions, transfers = [], []
+    try:
+        for version, tx in backend.iter_filtered(position, start=start, end=end, wallets=filters['wallets']):
+            flatten(tx, transactions, transfers)
+            position = version
+            exported += 1
+            if len(transactions) >= chunk_size or len(transfers) >= chunk_size:
+                if transactions:
+                    tables[0].write(transactions)
+                if transfers:
+                    tables[1].write(transfers)
+                transactions, transfers = [], []
+                if progress:
+                    progress(exported)
+        if transactions:
+            tables[0].write(transactions)
+        if transfers:
+            tables[1].write(transfers)
+    finally:
+        for table in tables:
+            table.close()
+
+    # Only recorded once all rows are on disk; an interrupted export is redone from here
+    _save_state(directory, {'format': format, 'filters': filters, 'position': position,
+                            'sizes': [table.size() for table in tables]})
+    return exported
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds from a number or an ISO date/time (UTC unless it has an offset)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the transaction history to Parquet or CSV")
+    parser.add_argument('directory', help="output directory")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+    parser.add_argument('--db', default="transaction_history.db", help="history database")
+    parser.add_argument('--since', help="start time, epoch seconds or ISO date")
+    parser.add_argument('--until', help="end time, epoch seconds or ISO date")
+    parser.add_argument('--wallet', action='append', help="only this wallet (repeatable)")
+    parser.add_argument('--full', action='store_true',
+                        help="rewrite the export instead of appending new and changed transactions "
+                             "(changed ones are appended again and supersede their earlier rows)")
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="transactions per written chunk")
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(args.db)
+    try:
+        count = export_history(
+            backend, args.directory, format=args.format,
+            start=_parse_time(args.since), end=_parse_time(args.until), wallets=args.wallet,
+            incremental=not args.full, chunk_size=args.chunk_size,
+            progress=lambda done: print(f"Exported {done} transactions")
+        )
+        print(f"Exported {count} transactions to {args.directory}")
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Error exporting history: {e}")
+    finally:
+        backend.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import metrics
+from typing import Any, Dict, List, Optional
+from solders.rpc.responses import GetTransactionResp
+from ratelimit import PRIORITY_LIVE
+from rpc_pool import RpcPool
+from tx_cache import TransactionCache
+
+TRANSACTION_OPTIONS = {
+    "encoding": "json",
+    "commitment": "confirmed",
+    "maxSupportedTransactionVersion": 0
+}
+
+class TransactionFetcher:
+    """Resolves lists of signatures to transactions.
+
+    Signatures are fetched either as individual ``getTransaction`` calls with
+    at most ``max_in_flight`` outstanding at a time, or, with ``use_batch``,
+    as JSON-RPC batch requests of up to ``batch_size`` calls each. Results are
+    returned in the order of the input signatures, with ``None`` in place of
+    any transaction that failed or is not available yet. Single calls are
+    hedged across the pool's endpoints when ``hedge`` is set, and all calls
+    queue on the pool's rate limits at ``priority``. With ``raw`` the JSON
+    results are returned as plain dicts instead of solders objects. With a
+    ``cache`` only signatures missing from it go to the network, and every
+    fetched result is added to it.
+    """
+
+    def __init__(self, pool: RpcPool, max_in_flight: int = 8,
+                 use_batch: bool = False, batch_size: int = 100,
+                 hedge: bool = False, priority: int = PRIORITY_LIVE, raw: bool = False,
+                 cache: Optional[TransactionCache] = None):
+        self.pool = pool
+        self.max_in_flight = max_in_flight
+        self.use_batch = use_batch
+        self.batch_size = batch_size
+        self.hedge = hedge
+        self.priority = priority
+        self.raw = raw
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def fetch_transactions(self, signatures: List[str]) -> List[Optional[Any]]:
+        if not signatures:
+            return []
+        signatures = [str(sig) for sig in signatures]
+        cached = {}
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get_many, signatures)
+        missing = [sig for sig in signatures if sig not in cached]
+        if self.cache is not None:
+            metrics.CACHE_LOOKUPS.inc('hit', amount=len(signatures) - len(missing))
+            metrics.CACHE_LOOKUPS.inc('miss', amount=len(missing))
+        fetched = dict(zip(missing, await self._fetch_results(missing)))
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put_many, [
+                (sig, result) for sig, result in fetched.items() if result is not None
+            ])
+        return [self._value(sig, cached.get(sig) or fetched.get(sig)) for sig in signatures]
+
+    async def _fetch_results(self, signatures: List[str]) -> List[Optional[Dict]]:
+        if not signatures:
+            return []
+        if self.use_batch:
+            chunks = [signatures[i:i + self.batch_size]
+                      for i in range(0, len(signatures), self.batch_size)]
+            results = await asyncio.gather(*(self._fetch_batch(chunk) for chunk in chunks))
+            return [tx for chunk in results for tx in chunk]
+        return await asyncio.gather(*(self._fetch_one(sig) for sig in signatures))
+
+    def _result(self, signature: str, item: Optional[Dict]) -> Optional[Dict]:
+        if item is None:
+            return None
+        if 'error' in item:
+            print(f"Error fetching transaction {signature}: {item['error']}")
+            return None
+        return item.get('result')
+
+    def _value(self, signature: str, result: Optional[Dict]) -> Optional[Any]:
+        if result is None or self.raw:
+            return result
+        try:
+            return GetTransactionResp.from_json(json.dumps({"jsonrpc": "2.0", "id": 0, "result": result})).value
+        except Exception as e:
+            print(f"Error decoding transaction {signature}: {e}")
+            return None
+
+    async def _fetch_one(self, signature: str) -> Optional[Dict]:
+        async with self.semaphore:
+            try:
+                item = await self.pool.request(
+                    "getTransaction", [str(signature), TRANSACTION_OPTIONS],
+                    hedge=self.hedge, priority=self.priority
+                )
+            except Exception as e:
+                print(f"Error fetching transaction {signature}: {e}")
+                return None
+        return self._result(signature, item)
+
+    async def _fetch_batch(self, signatures: List[str]) -> List[Optional[Dict]]:
+        async with self.semaphore:
+            try:
+                items = await self.pool.batch(
+                    [("getTransaction", [str(sig), TRANSACTION_OPTIONS]) for sig in signatures],
+                    priority=self.priority
+                )
+            except Exception as e:
+                print(f"Error fetching transaction batch: {e}")
+                return [None] * len(signatures)
+        return [self._result(sig, item) for sig, item in zip(signatures, items)]
@@ -1,8 +1,58 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
+import copy
 import queue
-from datetime import datetime
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import metrics
 from models import TransactionHistory  # Changed from relative import
+from rollups import accumulate
+from storage import transaction_timestamp
+
+# Entries kept in the live feed; older ones are dropped from the bottom
+MAX_LIVE_ENTRIES = 500
+# How often queued updates are applied, in milliseconds
+REFRESH_MS = 200
+# The summary window slides with time, so it is recomputed this often
+SUMMARY_RESYNC_SECONDS = 60
+
+def format_transaction(tx: Dict) -> str:
+    lines = [
+        f"Time: {tx.get('timestamp', '')}",
+        f"Signature: {tx.get('signature', '')}",
+        f"Type: {tx.get('transaction_type', 'Unknown')}"
+    ]
+    for action in tx.get('actions', []):
+        lines.append(f"  {action['type']}: {action['amount_change']} "
+                     f"{action.get('token_symbol', 'Unknown')}")
+    if tx.get('total_value_usd'):
+        lines.append(f"Value (USD): ${float(tx['total_value_usd']):,.2f}")
+    return "\n".join(lines)
+
+def render_summary(days: int, totals: Dict) -> List[str]:
+    lines = [
+        f"=== Transaction Summary (Last {days} Days) ===",
+        "",
+        f"Total Transactions: {totals['count']}",
+        f"Total Volume (USD): ${totals['volume_usd']:,.2f}",
+        "",
+        "=== Token Activity ==="
+    ]
+    for token, data in totals['tokens'].items():
+        lines.append("")
+        lines.append(f"{token}:")
+        lines.append(f"  Total Received: {data['total_in']:,.4f}")
+        lines.append(f"  Total Sent: {data['total_out']:,.4f}")
+        lines.append(f"  Volume (USD): ${data['volume_usd']:,.2f}")
+
+    lines.append("")
+    lines.append("=== Transaction Types ===")
+    for tx_type, count in totals['types'].items():
+        lines.append(f"{tx_type}: {count}")
+    return lines
 
 class WalletMonitorGUI:
     def __init__(self, history: TransactionHistory, update_queue: queue.Queue):
@@ -16,8 +66,26 @@ class WalletMonitorGUI:
         self.monitoring_active = False
         self.start_callback = None
         self.stop_callback = None
+
+        # Formatting and summary maths run on one worker thread; the Tk thread
+        # only applies the prepared text, at most once per REFRESH_MS tick
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.job = None
+        self.backlog: List = []
+        self.pending_live: List[str] = []
+        self.resync_requested = True
+        self.live_entry_lines = deque()
+        self.summary_lines: List[str] = []
+        # Owned by the worker thread
+        self.summary_days: Optional[int] = None
+        self.summary_totals: Optional[Dict] = None
+        self.summary_cutoff = 0.0
+        self.summary_synced_at = 0.0
         
         self._create_gui()
+        metrics.QUEUE_DEPTH.set_function(
+            lambda: self.update_queue.qsize() + len(self.backlog) + len(self.pending_live), 'gui_updates'
+        )
         
     def _create_gui(self):
         # Create main container
@@ -107,36 +175,86 @@ class WalletMonitorGUI:
                 self.stop_callback()
     
     def add_live_transaction(self, tx_info: str):
-        """Add a new transaction to the live feed."""
-        self.live_text.insert('1.0', f"\n{tx_info}\n{'='*60}\n")
-        self.live_text.see('1.0')
-    
+        """Queue a transaction for the live feed; it is shown on the next tick."""
+        self.pending_live.append(tx_info)
+
     def update_summary(self, *args):
-        """Update the historical summary display."""
+        """Recompute the historical summary on the next tick."""
+        self.resync_requested = True
+
+    def _prepare(self, items: List, live: List[str], days: Optional[int], resync: bool):
+        """Worker thread: format live entries and bring the summary up to date.
+
+        Transaction dicts from the update queue are added to the live feed and
+        applied to the running summary totals; any other item just asks for
+        the summary to be recomputed, as before.
+        """
+        transactions = []
+        for item in items:
+            if isinstance(item, dict):
+                live.append(format_transaction(item))
+                transactions.append(item)
+            else:
+                resync = True
+
+        summary_lines = None
         try:
-            days = int(self.period_var.get())
-            summary = self.history.get_summary(days)
-            
-            text = f"=== Transaction Summary (Last {days} Days) ===\n\n"
-            text += f"Total Transactions: {summary['total_transactions']}\n"
-            text += f"Total Volume (USD): ${summary['total_volume_usd']:,.2f}\n\n"
-            
-            text += "=== Token Activity ===\n"
-            for token, data in summary['tokens'].items():
-                text += f"\n{token}:\n"
-                text += f"  Total Received: {data['total_in']:,.4f}\n"
-                text += f"  Total Sent: {data['total_out']:,.4f}\n"
-                text += f"  Volume (USD): ${data['volume_usd']:,.2f}\n"
-            
-            text += "\n=== Transaction Types ===\n"
-            for tx_type, count in summary['transaction_types'].items():
-                text += f"{tx_type}: {count}\n"
-            
-            self.summary_text.delete('1.0', tk.END)
-            self.summary_text.insert('1.0', text)
-            
+            if days is not None:
+                if (resync or days != self.summary_days or
+                        time.monotonic() - self.summary_synced_at > SUMMARY_RESYNC_SECONDS):
+                    summary = self.history.get_summary(days)
+                    self.summary_totals = {
+                        'count': summary['total_transactions'],
+                        'volume_usd': summary['total_volume_usd'],
+                        'tokens': copy.deepcopy(summary['tokens']),
+                        'types': dict(summary['transaction_types'])
+                    }
+                    self.summary_days = days
+                    self.summary_cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+                    self.summary_synced_at = time.monotonic()
+                else:
+                    # Apply only the new transactions to the running totals
+                    for tx in transactions:
+                        ts = transaction_timestamp(tx)
+                        if ts is not None and ts >= self.summary_cutoff:
+                            accumulate(self.summary_totals, tx)
+                summary_lines = render_summary(days, self.summary_totals)
         except Exception as e:
             print(f"Error updating summary: {e}")
+        return live, summary_lines
+
+    def _apply_live(self, entries: List[str]):
+        entries = entries[-MAX_LIVE_ENTRIES:]
+        blocks = [f"\n{entry}\n{'='*60}\n" for entry in reversed(entries)]
+        self.live_text.insert('1.0', "".join(blocks))
+        for block in reversed(blocks):
+            self.live_entry_lines.appendleft(block.count('\n'))
+        dropped = 0
+        while len(self.live_entry_lines) > MAX_LIVE_ENTRIES:
+            dropped += self.live_entry_lines.pop()
+        if dropped:
+            kept = sum(self.live_entry_lines)
+            self.live_text.delete(f"{kept + 1}.0", tk.END)
+        self.live_text.see('1.0')
+
+    def _apply_summary(self, lines: List[str]):
+        """Rewrite only the summary lines that changed."""
+        if len(lines) < len(self.summary_lines):
+            # From the end of the last kept line, so no empty line is left behind
+            self.summary_text.delete(f"{len(lines)}.end" if lines else '1.0', tk.END)
+        for number, line in enumerate(lines, start=1):
+            if number > len(self.summary_lines):
+                self.summary_text.insert(tk.END, ("\n" if number > 1 else "") + line)
+            elif self.summary_lines[number - 1] != line:
+                self.summary_text.delete(f"{number}.0", f"{number}.end")
+                self.summary_text.insert(f"{number}.0", line)
+        self.summary_lines = lines
+
+    def _period_days(self) -> Optional[int]:
+        try:
+            return int(self.period_var.get())
+        except ValueError:
+            return None
     
     def set_callbacks(self, start_callback, stop_callback):
         """Set callbacks for start/stop monitoring."""
@@ -146,15 +264,40 @@ class WalletMonitorGUI:
     def start(self):
         """Start the GUI main loop."""
         self.update_check()
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.executor.shutdown(wait=False)
     
     def update_check(self):
-        """Check for updates from the monitor thread."""
+        """Apply finished work and hand everything queued since the last tick to the worker."""
         try:
-            while not self.update_queue.empty():
-                _ = self.update_queue.get_nowait()
-                self.update_summary()
-        except queue.Empty:
-            pass
+            if self.job is not None and self.job.done():
+                started = time.perf_counter()
+                try:
+                    live, summary_lines = self.job.result()
+                    if live:
+                        self._apply_live(live)
+                    if summary_lines is not None:
+                        self._apply_summary(summary_lines)
+                except Exception as e:
+                    print(f"Error applying updates: {e}")
+                self.job = None
+                metrics.GUI_REFRESH_SECONDS.observe(time.perf_counter() - started, 'tk')
+
+            try:
+                while True:
+                    self.backlog.append(self.update_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stale = time.monotonic() - self.summary_synced_at > SUMMARY_RESYNC_SECONDS
+            if self.job is None and (self.backlog or self.pending_live or
+                                     self.resync_requested or stale):
+                items, self.backlog = self.backlog, []
+                live, self.pending_live = self.pending_live, []
+                resync, self.resync_requested = self.resync_requested, False
+                self.job = self.executor.submit(self._prepare, items, live,
+                                                self._period_days(), resync)
         finally:
-            self.root.after(1000, self.update_check)
\ No newline at end of file
+            self.root.after(REFRESH_MS, self.update_check)
\ No newline at end of file
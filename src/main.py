@@ -1,17 +1,30 @@
+import os
 import sys
 import asyncio
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                           QLabel, QLineEdit, QPushButton, QTextEdit, QTabWidget,
-                           QComboBox, QGridLayout)
+                           QLabel, QLineEdit, QPushButton, QTabWidget,
+                           QComboBox, QGridLayout, QTableView, QHeaderView)
 from qasync import QEventLoop, asyncSlot
 from monitor import TransactionMonitor
+from alerts import AlertEngine, load_rules
+from table_models import HistoryTableModel, LiveFeedModel
 from datetime import datetime, timedelta
 
+# Alert rules in the same JSON format as the daemon's --alerts file
+ALERT_RULES_FILE = "alert_rules.json"
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, alert_rules: str = ALERT_RULES_FILE):
         super().__init__()
-        self.monitor = TransactionMonitor()
+        self.monitor = TransactionMonitor(valuation=True)
         self.is_monitoring = False
+        self.alert_engine = None
+        if os.path.exists(alert_rules):
+            try:
+                self.alert_engine = AlertEngine(load_rules(alert_rules))
+                self.alert_engine.attach(self.monitor)
+            except (OSError, ValueError) as e:
+                print(f"Error loading alert rules from {alert_rules}: {e}")
         self.initUI()
 
     def initUI(self):
@@ -47,11 +60,11 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(wallet_layout)
 
-        self.transaction_display = QTextEdit()
-        self.transaction_display.setReadOnly(True)
+        self.live_model = LiveFeedModel(parent=self)
+        self.transaction_display = self.create_table(self.live_model)
         layout.addWidget(self.transaction_display)
 
-        self.monitor.set_callback(self.update_transaction_display)
+        self.monitor.subscribe("live_feed", callback=self.on_events, maxsize=self.live_model.capacity)
 
         tab.setLayout(layout)
         return tab
@@ -73,15 +86,37 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(range_layout)
 
-        self.history_display = QTextEdit()
-        self.history_display.setReadOnly(True)
+        self.history_summary = QLabel()
+        layout.addWidget(self.history_summary)
+
+        self.history_model = HistoryTableModel(parent=self)
+        self.history_display = self.create_table(self.history_model)
         layout.addWidget(self.history_display)
 
         tab.setLayout(layout)
         return tab
 
-    def update_transaction_display(self, text):
-        self.transaction_display.append(text)
+    def create_table(self, model):
+        table = QTableView()
+        table.setModel(model)
+        table.setEditTriggers(QTableView.NoEditTriggers)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setWordWrap(False)
+        table.verticalHeader().setVisible(False)
+        # Fixed row heights and column widths keep layout independent of row count
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def on_events(self, batch):
+        for event in batch:
+            if event.kind == "transaction":
+                self.live_model.add(event.transaction)
+            elif event.kind == "alert":
+                self.statusBar().showMessage(f"Alert: {event.message}", 10000)
+            else:
+                self.statusBar().showMessage(f"Error: {event.message}", 10000)
 
     def update_history_display(self):
         range_text = self.range_selector.currentText()
@@ -98,15 +133,10 @@ class MainWindow(QMainWindow):
         if not transactions:
             summary = "No transactions found for the selected period."
         else:
-            total_transactions = len(transactions)
-            summary = f"=== Transaction Summary (Last {range_text}) ===\n"
-            summary += f"Total Transactions: {total_transactions}\n"
-            summary += "\n=== Detailed Transactions ===\n"
-            for tx in transactions:
-                summary += f"\n{self.monitor.format_transaction_display(tx)}\n"
-                summary += "-" * 50 + "\n"
-
-        self.history_display.setText(summary)
+            summary = f"Transactions (Last {range_text}): {len(transactions)}"
+
+        self.history_summary.setText(summary)
+        self.history_model.set_transactions(transactions or [])
 
     @asyncSlot()
     async def toggle_monitoring(self):
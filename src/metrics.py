@@ -0,0 +1,257 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; wide enough for both microsecond parsing and multi-second RPC calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+class Registry:
+    """Holds all metrics. Recording is a no-op until ``enabled`` is set."""
+
+    def __init__(self):
+        self.enabled = False
+        self.metrics: List['Metric'] = []
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.registry = registry
+        self.lock = threading.Lock()
+        registry.metrics.append(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        if not self.registry.enabled:
+            return
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_labels(self.label_names, labels)} {value}" for labels, value in items]
+
+class Gauge(Metric):
+    """A value that is either set directly or read from a function at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple, float] = {}
+        self.functions: Dict[Tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, *labels: str):
+        if not self.registry.enabled:
+            return
+        self.values[labels] = value
+
+    def set_function(self, function: Callable[[], float], *labels: str):
+        # Registered even while disabled: it costs nothing until scraped
+        self.functions[labels] = function
+
+    def current(self) -> Dict[Tuple, float]:
+        values = dict(self.values)
+        for labels, function in list(self.functions.items()):
+            try:
+                values[labels] = float(function())
+            except Exception:
+                continue
+        return values
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, labels)} {value}"
+                for labels, value in self.current().items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple, Tuple[List[int], float, int]]:
+        with self.lock:
+            return {labels: (list(counts), total, count)
+                    for labels, (counts, total, count) in self.series.items()}
+
+    def quantile(self, fraction: float, counts: List[int]) -> Optional[float]:
+        """Estimate a quantile from bucket counts by interpolating within the bucket."""
+        count = sum(counts)
+        if not count:
+            return None
+        rank = fraction * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in self.snapshot().items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+# Monitor loop
+POLL_SECONDS = Histogram('solana_monitor_poll_seconds', "Duration of one wallet poll")
+TRANSACTIONS = Counter('solana_monitor_transactions_total',
+                       "Transactions parsed and stored", ['source'])
+DETECTION_LAG = Histogram('solana_monitor_detection_lag_seconds',
+                          "Time from block time to the transaction being stored",
+                          buckets=LAG_BUCKETS)
+PARSE_SECONDS = Histogram('solana_monitor_parse_seconds', "Time to parse one batch of transactions")
+VALUATION_SECONDS = Histogram('solana_monitor_valuation_seconds',
+                              "Time to value one batch of transactions in USD")
+PERSIST_SECONDS = Histogram('solana_monitor_persist_seconds', "Time to store one batch of transactions")
+HISTORY_SIZE = Gauge('solana_monitor_history_transactions', "Transactions in the history")
+QUEUE_DEPTH = Gauge('solana_monitor_queue_depth', "Items waiting in internal queues", ['queue'])
+
+# RPC
+RPC_SECONDS = Histogram('solana_monitor_rpc_seconds', "RPC call latency", ['method'])
+RPC_ERRORS = Counter('solana_monitor_rpc_errors_total', "Failed RPC calls", ['method', 'reason'])
+CACHE_LOOKUPS = Counter('solana_monitor_tx_cache_lookups_total',
+                        "Transaction cache lookups", ['result'])
+
+# Front ends
+GUI_REFRESH_SECONDS = Histogram('solana_monitor_gui_refresh_seconds',
+                                "Time spent applying one GUI refresh", ['gui'])
+
+def enable():
+    REGISTRY.enabled = True
+
+class MetricsServer:
+    """Serves ``/metrics`` in the Prometheus text format from a background thread."""
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1", registry: Registry = REGISTRY):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class MetricsLogger:
+    """Prints a one-paragraph summary of the metrics every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 60.0, log: Callable[[str], None] = print):
+        self.interval = interval
+        self.log = log
+        self.stopped = threading.Event()
+        self.last_total = TRANSACTIONS.total()
+        self.last_time = time.monotonic()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.log(self.summary())
+            except Exception as e:
+                print(f"Error logging metrics: {e}")
+
+    def summary(self) -> str:
+        now = time.monotonic()
+        total = TRANSACTIONS.total()
+        rate = (total - self.last_total) / max(now - self.last_time, 1e-9)
+        self.last_total, self.last_time = total, now
+
+        parts = [f"{rate:.1f} tx/s"]
+        for (method,), (counts, _, count) in sorted(RPC_SECONDS.snapshot().items()):
+            p50 = RPC_SECONDS.quantile(0.5, counts)
+            p95 = RPC_SECONDS.quantile(0.95, counts)
+            parts.append(f"{method}: {count} calls p50={p50 * 1000:.0f}ms p95={p95 * 1000:.0f}ms")
+        errors = {labels: value for labels, value in RPC_ERRORS.values.items() if value}
+        if errors:
+            parts.append("errors: " + ", ".join(f"{method}/{reason}={value:.0f}"
+                                                for (method, reason), value in sorted(errors.items())))
+        lag = DETECTION_LAG.snapshot().get(())
+        if lag:
+            parts.append(f"lag p50={DETECTION_LAG.quantile(0.5, lag[0]):.1f}s")
+        depths = {labels[0]: value for labels, value in QUEUE_DEPTH.current().items() if value}
+        if depths:
+            parts.append("queues: " + ", ".join(f"{name}={value:.0f}" for name, value in sorted(depths.items())))
+        history = HISTORY_SIZE.current().get(())
+        if history is not None:
+            parts.append(f"history={history:.0f}")
+        return "Metrics: " + "; ".join(parts)
+
+    def stop(self):
+        self.stopped.set()
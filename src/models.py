@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta
-import json
 from pathlib import Path
+from storage import HistoryBackend, SQLiteBackend, migrate_legacy_history
+from timeindex import TimeIndex
+from columnar import ColumnarHistory
+from rollups import SummaryRollups
 
 @dataclass
 class TokenMetadata:
@@ -13,62 +16,68 @@ class TokenMetadata:
     coingecko_id: str = ""
 
 class TransactionHistory:
-    def __init__(self):
-        self.transactions: List[Dict] = []
+    def __init__(self, backend: Optional[HistoryBackend] = None):
+        self.index = TimeIndex()
+        self.columnar_view = None
+        self.rollups = None
+        # Legacy whole-file JSON history, imported into the backend once
         self.history_file = Path("solana_transaction_history.json")
+        self.backend = backend or SQLiteBackend("solana_transaction_history.db")
         self.load_history()
         
     def load_history(self):
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    self.transactions = json.load(f)
-            except Exception as e:
-                print(f"Error loading history: {e}")
+        try:
+            migrate_legacy_history(str(self.history_file), self.backend)
+            self.index = TimeIndex(self.backend)
+            self.rollups = SummaryRollups(self.backend)
+        except Exception as e:
+            print(f"Error loading history: {e}")
                 
     def save_history(self):
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.transactions, f, indent=2)
+            self.backend.flush()
         except Exception as e:
             print(f"Error saving history: {e}")
             
+    @property
+    def transactions(self) -> List[Dict]:
+        return self.index.all()
+
+    def get_range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Transactions between two epoch timestamps (inclusive), oldest first."""
+        return self.index.between(start, end)
+
+    def get_latest(self, count: int) -> List[Dict]:
+        return self.index.latest(count)
+
+    def columnar(self) -> ColumnarHistory:
+        """NumPy-backed columnar view of the history, kept in sync on append."""
+        if self.columnar_view is None:
+            self.columnar_view = ColumnarHistory(self.index.all())
+        return self.columnar_view
+
     def add_transaction(self, tx_info: Dict):
-        self.transactions.append(tx_info)
-        self.save_history()
+        try:
+            if self.backend.append([tx_info]):
+                self.index.add(tx_info)
+                if self.columnar_view is not None:
+                    self.columnar_view.append(tx_info)
+                if self.rollups:
+                    self.rollups.add(tx_info)
+                    self.rollups.flush()
+        except Exception as e:
+            print(f"Error saving history: {e}")
         
     def get_summary(self, days: int = 7) -> Dict:
         cutoff = datetime.now() - timedelta(days=days)
-        recent_txs = [tx for tx in self.transactions 
-                     if datetime.strptime(tx['timestamp'], '%Y-%m-%d %H:%M:%S') > cutoff]
-        
-        summary = {
-            'total_transactions': len(recent_txs),
-            'total_volume_usd': sum(tx.get('total_value_usd', 0) for tx in recent_txs),
-            'tokens': {},
-            'transaction_types': {}
-        }
-        
-        for tx in recent_txs:
-            # Aggregate token volumes
-            for action in tx['actions']:
-                token_symbol = action.get('token_symbol', 'Unknown')
-                if token_symbol not in summary['tokens']:
-                    summary['tokens'][token_symbol] = {
-                        'total_in': 0,
-                        'total_out': 0,
-                        'volume_usd': 0
-                    }
-                
-                if action['type'] == 'received':
-                    summary['tokens'][token_symbol]['total_in'] += float(action['amount_change'])
-                else:
-                    summary['tokens'][token_symbol]['total_out'] += float(action['amount_change'])
-                    
-                summary['tokens'][token_symbol]['volume_usd'] += float(action.get('value_usd', 0))
-            
-            # Aggregate transaction types
-            tx_type = tx.get('transaction_type', 'Unknown')
-            summary['transaction_types'][tx_type] = summary['transaction_types'].get(tx_type, 0) + 1
-            
-        return summary
\ No newline at end of file
+        if self.rollups:
+            totals = self.rollups.summarize(cutoff.timestamp(), self.index.between_exclusive)
+        else:
+            return self.columnar().summary(cutoff.timestamp())
+
+        return {
+            'total_transactions': totals['count'],
+            'total_volume_usd': totals['volume_usd'],
+            'tokens': totals['tokens'],
+            'transaction_types': totals['types']
+        }
\ No newline at end of file
@@ -1,11 +1,25 @@
 from datetime import datetime, timezone, timedelta
 import json
+import os
+import time
 from solders.signature import Signature
 from solders.pubkey import Pubkey
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set
 import asyncio
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
+from solders.rpc.responses import GetSignaturesForAddressResp
+from fetcher import TransactionFetcher
+from backfill import Backfiller
+from ratelimit import PRIORITY_LIVE, RateLimits
+from scheduler import PollScheduler
+from subscriber import SubscriptionManager
+from storage import HistoryBackend, SQLiteBackend, migrate_legacy_history
+from timeindex import TimeIndex
+import metrics
+from columnar import ColumnarHistory
+from events import BLOCK, Event, EventBus, transaction_event
+from decoder import TokenBalance, build_transaction, parse_raw_transaction, parse_raw_transactions
+from rpc_pool import DEFAULT_ENDPOINTS, RpcError, RpcPool
+from tx_cache import TransactionCache
 
 class TransactionEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -15,142 +29,504 @@ class TransactionEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super().default(obj)
 
+# Fields added by the valuation stage rather than the parser
+VALUATION_FIELDS = ('sol_value_usd', 'total_value_usd')
+TRANSFER_VALUATION_FIELDS = ('symbol', 'value_usd')
+
+def _carry_valuation(old: Dict[str, Any], new: Dict[str, Any]):
+    """Copy USD values and symbols from a stored transaction onto its fresh parse."""
+    for field in VALUATION_FIELDS:
+        if field in old and field not in new:
+            new[field] = old[field]
+    old_transfers = {(transfer.get('mint'), transfer.get('owner')): transfer
+                     for transfer in old.get('token_transfers') or ()}
+    for transfer in new.get('token_transfers') or ():
+        previous = old_transfers.get((transfer.get('mint'), transfer.get('owner')))
+        if previous is None:
+            continue
+        for field in TRANSFER_VALUATION_FIELDS:
+            if field in previous and field not in transfer:
+                transfer[field] = previous[field]
+
 class TransactionHistory:
-    def __init__(self, filename="transaction_history.json"):
+    def __init__(self, filename="transaction_history.json", backend: Optional[HistoryBackend] = None):
+        # ``filename`` is the legacy whole-file JSON history, imported once
         self.filename = filename
-        self.transactions = []
+        self.backend = backend or SQLiteBackend("transaction_history.db", json_encoder=TransactionEncoder)
+        self.index = TimeIndex()
+        self.columnar_view = None
         self.load_history()
 
+    @property
+    def transactions(self) -> List[Dict]:
+        return self.index.all()
+
     def load_history(self):
         try:
-            with open(self.filename, 'r') as f:
-                self.transactions = json.load(f)
-        except FileNotFoundError:
-            self.transactions = []
-        except json.JSONDecodeError as e:
+            migrate_legacy_history(self.filename, self.backend)
+            self.index = TimeIndex(self.backend)
+        except Exception as e:
             print(f"Error loading history: {e}")
-            self.transactions = []
+            self.index = TimeIndex()
 
     def save_history(self, new_transactions):
+        started = time.perf_counter()
         try:
-            self.transactions.extend(new_transactions)
-            unique_transactions = {tx['signature']: tx for tx in self.transactions}.values()
-            self.transactions = list(unique_transactions)
-            
-            with open(self.filename, 'w') as f:
-                json.dump(self.transactions, f, cls=TransactionEncoder, indent=2)
+            # Only transactions not already stored are written and kept
+            added = self.backend.append(new_transactions)
+            self.index.extend(added)
+            if self.columnar_view is not None:
+                self.columnar_view.extend(added)
         except Exception as e:
             print(f"Error saving history: {e}")
+        metrics.PERSIST_SECONDS.observe(time.perf_counter() - started)
+
+    def get_range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Transactions between two epoch timestamps (inclusive), oldest first."""
+        return self.index.between(start, end)
+
+    def get_latest(self, count: int) -> List[Dict]:
+        return self.index.latest(count)
+
+    def columnar(self) -> ColumnarHistory:
+        """NumPy-backed columnar view of the history, kept in sync on append."""
+        if self.columnar_view is None:
+            self.columnar_view = ColumnarHistory(self.index.all())
+        return self.columnar_view
+
+class CursorStore:
+    """Persists the newest processed signature and slot for each wallet.
+
+    Cursors live in the history backend, one row per wallet, so an update
+    writes just that wallet's row. ``filename`` is the legacy JSON cursor
+    file, imported once.
+    """
+
+    def __init__(self, backend: HistoryBackend, filename="monitor_cursors.json"):
+        self.backend = backend
+        self.filename = filename
+        self.cursors: Dict[str, Dict[str, Any]] = {}
+        self.load_cursors()
+
+    def load_cursors(self):
+        try:
+            self._migrate_legacy()
+            self.cursors = self.backend.load_cursors()
+        except Exception as e:
+            print(f"Error loading cursors: {e}")
+            self.cursors = {}
+
+    def _migrate_legacy(self):
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error migrating cursors from {self.filename}: {e}")
+            return
+        for wallet, cursor in legacy.items():
+            self.backend.save_cursor(wallet, cursor['signature'], cursor['slot'])
+        os.replace(self.filename, f"{self.filename}.migrated")
+
+    def get(self, wallet: str) -> Optional[Dict[str, Any]]:
+        return self.cursors.get(wallet)
+
+    def update(self, wallet: str, signature: str, slot: int):
+        self.cursors[wallet] = {'signature': signature, 'slot': slot}
+        try:
+            self.backend.save_cursor(wallet, signature, slot)
+        except Exception as e:
+            print(f"Error saving cursors: {e}")
+
+def _token_balances(balances) -> List[TokenBalance]:
+    return [
+        (balance.account_index, str(balance.mint),
+         str(balance.owner) if balance.owner is not None else '',
+         int(balance.ui_token_amount.amount), balance.ui_token_amount.decimals)
+        for balance in balances or ()
+    ]
+
+def parse_transaction(tx_data, block_time):
+    """Parse a solders transaction; ``decoder.parse_raw_transaction`` is the fast path."""
+    try:
+        meta = tx_data.transaction.meta
+        return build_transaction(
+            str(tx_data.transaction.transaction.signatures[0]),
+            block_time,
+            tx_data.slot,
+            meta.pre_balances if meta else None,
+            meta.post_balances if meta else None,
+            _token_balances(meta.pre_token_balances if meta else None),
+            _token_balances(meta.post_token_balances if meta else None)
+        )
+    except Exception as e:
+        print(f"Error parsing transaction: {e}")
+        return None
+
+def parse_transactions(values: List[Any]) -> List[Optional[Dict[str, Any]]]:
+    """Parse solders transactions; module level so a process pool can run it."""
+    return [parse_transaction(value, value.block_time) for value in values]
 
 class TransactionMonitor:
-    def __init__(self):
+    # Without a cursor only the newest page is fetched, matching the old behaviour
+    INITIAL_SIGNATURE_LIMIT = 20
+    # getSignaturesForAddress accepts at most 1000 signatures per call
+    SIGNATURE_PAGE_LIMIT = 1000
+    # Seconds to wait for requested price quotes before valuing a batch again
+    VALUATION_RETRY_DELAYS = (5.0, 30.0, 120.0)
+
+    def __init__(self, max_in_flight: int = 8, use_batch: bool = False,
+                 min_interval: float = 2.0, max_interval: float = 60.0,
+                 max_concurrency: int = 16, max_requests_per_second: float = 10.0,
+                 ws_url: Optional[str] = None, account_updates: bool = False,
+                 endpoints: Optional[List[str]] = None, rpc_pool: Optional[RpcPool] = None,
+                 hedge: bool = False, method_rates: Optional[Dict[str, float]] = None,
+                 fast_decode: bool = True, cache_dir: Optional[str] = "tx_cache",
+                 valuation: bool = False):
         self.history = TransactionHistory()
-        self.client = AsyncClient("https://api.mainnet-beta.solana.com")
+        self.cursors = CursorStore(self.history.backend)
+        # Pass ``rpc_pool`` to share one pool (and its rate limits) with other components
+        self.pool = rpc_pool or RpcPool(
+            endpoints or DEFAULT_ENDPOINTS,
+            rate_limits=RateLimits(max_requests_per_second, method_rates)
+        )
+        # The fast path parses raw JSON results directly instead of building
+        # solders response objects for them
+        self.fast_decode = fast_decode
+        # Confirmed transactions never change, so fetched ones are kept on disk
+        # and never requested twice; ``cache_dir=None`` turns this off
+        self.tx_cache = TransactionCache(cache_dir) if cache_dir else None
+        self.fetcher = TransactionFetcher(self.pool, max_in_flight=max_in_flight,
+                                          use_batch=use_batch, hedge=hedge, raw=fast_decode,
+                                          cache=self.tx_cache)
+        # Symbols and USD values are filled in after storing, in the
+        # background; off by default as it calls the token list and price APIs
+        self.valuator = None
+        self.valuation_tasks = set()
+        if valuation:
+            from services import PriceTracker, TokenRegistry
+            from valuation import Valuator
+            self.valuator = Valuator(TokenRegistry(), PriceTracker())
+        self.scheduler = PollScheduler(self._poll_wallet, min_interval=min_interval,
+                                       max_interval=max_interval,
+                                       max_concurrency=max_concurrency)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # With a websocket URL, notifications trigger polls and the scheduler
+        # only falls back to regular polling while the connection is down
+        self.subscriptions = None
+        if ws_url:
+            self.subscriptions = SubscriptionManager(ws_url, self.scheduler.wake,
+                                                     on_status=self._on_subscription_status,
+                                                     account_updates=account_updates)
+        self.subscription_task = None
         self.monitoring = False
-        self.current_wallet = None
-        self.callback = None
+        self.wallets: Dict[str, Pubkey] = {}
+        # New transactions and errors are published here; every consumer
+        # subscribes with its own bounded queue, so none can stall polling
+        # unless it asks for the ``block`` policy
+        self.events = EventBus()
+        self.callback_subscription = None
+        self.transaction_subscription = None
         self.monitoring_task = None
 
+        # Read only when metrics are scraped or logged
+        metrics.HISTORY_SIZE.set_function(lambda: len(self.history.index))
+        metrics.QUEUE_DEPTH.set_function(lambda: len(self.scheduler.in_flight), 'polls_in_flight')
+        metrics.QUEUE_DEPTH.set_function(
+            lambda: sum(1 for due, _, _ in self.scheduler.heap if due <= time.monotonic()), 'polls_due'
+        )
+        if self.pool.rate_limits:
+            metrics.QUEUE_DEPTH.set_function(
+                lambda: sum(len(bucket.waiters) for bucket in self.pool.rate_limits.buckets.values()),
+                'rate_limit_waiters'
+            )
+
+    def subscribe(self, name: str = "subscriber", **options):
+        """Subscribe to monitor events; see ``events.EventBus.subscribe``."""
+        return self.events.subscribe(name, **options)
+
     def set_callback(self, callback):
-        self.callback = callback
+        """Receive each new transaction as display text, and errors as "Error: ..." text."""
+        def deliver(batch: List[Event]):
+            for event in batch:
+                if event.kind == "transaction":
+                    callback(self.format_transaction_display(event.transaction))
+                else:
+                    callback(f"Error: {event.message}")
+
+        if self.callback_subscription:
+            self.events.unsubscribe(self.callback_subscription)
+        # These stand in for direct calls that saw every event, so they stay lossless
+        self.callback_subscription = self.events.subscribe("callback", callback=deliver,
+                                                           policy=BLOCK,
+                                                           kinds=["transaction", "error"])
+
+    def set_transaction_callback(self, callback):
+        """Receive each new transaction as its parsed dict instead of display text."""
+        def deliver(batch: List[Event]):
+            for event in batch:
+                callback(event.transaction)
+
+        if self.transaction_subscription:
+            self.events.unsubscribe(self.transaction_subscription)
+        self.transaction_subscription = self.events.subscribe(
+            "transaction_callback", callback=deliver, policy=BLOCK, kinds=["transaction"]
+        )
 
-    async def start_monitoring(self, wallet_address: str):
+    def add_wallet(self, wallet_address: str):
+        pubkey = Pubkey.from_string(wallet_address)
+        self.wallets[str(pubkey)] = pubkey
+        self.scheduler.add(str(pubkey))
+        if self.subscriptions:
+            self.subscriptions.add(str(pubkey))
+
+    def remove_wallet(self, wallet_address: str):
+        self.wallets.pop(wallet_address, None)
+        self.scheduler.remove(wallet_address)
+        if self.subscriptions:
+            self.subscriptions.remove(wallet_address)
+
+    def _on_subscription_status(self, connected: bool):
+        # While subscribed, polling is only a slow safety net. Either way every
+        # wallet is polled right away: after a reconnect that backfills the gap
+        # through the signature cursor, after a disconnect it resumes polling.
+        self.scheduler.min_interval = self.max_interval if connected else self.min_interval
+        self.scheduler.wake_all()
+
+    async def start_monitoring(self, *wallet_addresses: str):
+        """Add the given wallets and start the shared scheduler if needed."""
         try:
-            pubkey = Pubkey.from_string(wallet_address)
+            for wallet_address in wallet_addresses:
+                self.add_wallet(wallet_address)
             self.monitoring = True
-            self.current_wallet = pubkey
-            
-            if self.monitoring_task:
-                self.monitoring_task.cancel()
             
-            self.monitoring_task = asyncio.create_task(self._monitor_wallet())
+            if not self.monitoring_task:
+                self.monitoring_task = asyncio.create_task(self._run_scheduler())
+            if self.subscriptions and not self.subscription_task:
+                self.subscription_task = asyncio.create_task(self.subscriptions.run())
         except Exception as e:
             print(f"Error starting monitoring: {e}")
-            if self.callback:
-                self.callback(f"Error: Could not start monitoring - {str(e)}")
+            await self.events.publish([Event("error", message=f"Could not start monitoring - {str(e)}")])
 
     async def stop_monitoring(self):
         self.monitoring = False
+        for wallet_address in list(self.wallets):
+            self.remove_wallet(wallet_address)
         if self.monitoring_task:
+            self.scheduler.stop()
             self.monitoring_task.cancel()
             self.monitoring_task = None
+        if self.subscription_task:
+            self.subscriptions.stop()
+            self.subscription_task.cancel()
+            self.subscription_task = None
 
-    async def _monitor_wallet(self):
+    async def _run_scheduler(self):
         try:
-            while self.monitoring:
-                print(f"Fetching transactions for wallet: {self.current_wallet}")
-                response = await self.client.get_signatures_for_address(
-                    self.current_wallet,
-                    limit=20,
-                    commitment=Confirmed
-                )
-                
-                if response.value:
-                    print(f"Found {len(response.value)} recent transactions")
-                    new_transactions = []
-                    
-                    for tx_info in response.value:
-                        tx_response = await self.client.get_transaction(
-                            tx_info.signature,
-                            commitment=Confirmed
-                        )
-                        
-                        if tx_response.value:
-                            parsed_tx = self.parse_transaction(tx_response.value, tx_response.value.block_time)
-                            if parsed_tx:
-                                new_transactions.append(parsed_tx)
-                
-                    if new_transactions:
-                        self.history.save_history(new_transactions)
-                        if self.callback:
-                            for tx in new_transactions:
-                                formatted_tx = self.format_transaction_display(tx)
-                                self.callback(formatted_tx)
-                
-                await asyncio.sleep(2)
-                
+            await self.scheduler.run()
         except asyncio.CancelledError:
             print("Monitoring cancelled")
-        except Exception as e:
-            print(f"Error monitoring wallet: {e}")
-            if self.callback:
-                self.callback(f"Error: {str(e)}")
 
-    def parse_transaction(self, tx_data, block_time):
+    async def _get_signatures(self, wallet: Pubkey, limit: int, before: Optional[str] = None,
+                              until: Optional[str] = None, priority: int = PRIORITY_LIVE) -> List[Any]:
+        options = {"limit": limit, "commitment": "confirmed"}
+        if before:
+            options["before"] = before
+        if until:
+            options["until"] = until
+        item = await self.pool.request("getSignaturesForAddress", [str(wallet), options],
+                                       priority=priority)
+        if 'error' in item:
+            raise RpcError(f"getSignaturesForAddress failed: {item['error']}")
+        return GetSignaturesForAddressResp.from_json(json.dumps(item)).value or []
+
+    async def _fetch_new_signatures(self, wallet: Pubkey) -> List[Any]:
+        """Return signatures newer than the wallet's cursor, oldest first.
+
+        With a cursor, pages backwards from the tip with ``before`` until the
+        cursor (passed as ``until``) is reached, so a burst larger than one
+        page is never dropped. Without one, only the newest page is returned.
+        """
+        cursor = self.cursors.get(str(wallet))
+        if not cursor:
+            page = await self._get_signatures(wallet, self.INITIAL_SIGNATURE_LIMIT)
+            return list(reversed(page))
+
+        signatures = []
+        before = None
+        while True:
+            page = await self._get_signatures(wallet, self.SIGNATURE_PAGE_LIMIT,
+                                              before=before, until=cursor['signature'])
+            signatures.extend(page)
+            if len(page) < self.SIGNATURE_PAGE_LIMIT:
+                break
+            before = str(page[-1].signature)
+
+        return list(reversed(signatures))
+
+    async def backfill(self, wallet_address: str, max_transactions: Optional[int] = None,
+                       workers: int = 8, use_batch: bool = False, process_pool: bool = False,
+                       progress=None) -> int:
+        """Load the wallet's existing history, resuming any interrupted backfill."""
+        parse_batch = parse_raw_transactions if self.fast_decode else parse_transactions
+        backfiller = Backfiller(self, parse_batch, workers=workers, use_batch=use_batch,
+                                process_pool=process_pool, raw=self.fast_decode,
+                                cache=self.tx_cache)
+        return await backfiller.run(wallet_address, max_transactions=max_transactions,
+                                    progress=progress)
+
+    async def _poll_wallet(self, wallet_address: str) -> int:
+        """Poll one wallet once and return how many new transactions it had."""
+        wallet = self.wallets.get(wallet_address)
+        if wallet is None:
+            return 0
+
+        poll_started = time.perf_counter()
         try:
-            parsed_tx = {
-                'signature': str(tx_data.transaction.signatures[0]),
-                'timestamp': datetime.fromtimestamp(block_time, tz=timezone.utc).isoformat(),
-                'token_transfers': [],
-                'type': 'unknown'
-            }
-
-            if tx_data.meta:
-                pre_balances = tx_data.meta.pre_balances
-                post_balances = tx_data.meta.post_balances
+            print(f"Fetching transactions for wallet: {wallet}")
+            signatures = await self._fetch_new_signatures(wallet)
+            if not signatures:
+                return 0
+
+            print(f"Found {len(signatures)} new transactions")
+            new_transactions = []
+            last_processed = None
+            signature_strs = [str(tx_info.signature) for tx_info in signatures]
+            # Stored by an earlier poll that stopped at a gap; not fetched again
+            stored = self.history.backend.contains_many(signature_strs)
+            pending = [signature for signature in signature_strs if signature not in stored]
+            tx_values = dict(zip(pending, await self.fetcher.fetch_transactions(pending)))
+
+            parse_started = time.perf_counter()
+            gap = False
+            for tx_info, signature in zip(signatures, signature_strs):
+                if signature in stored:
+                    if not gap:
+                        last_processed = tx_info
+                    continue
+                tx_value = tx_values.get(signature)
+                if not tx_value:
+                    # Failed or not retrievable yet; the cursor stops before
+                    # it so it is retried next poll, but everything fetched
+                    # after it is still stored now
+                    gap = True
+                    continue
+
+                if self.fast_decode:
+                    parsed_tx = parse_raw_transaction(tx_value)
+                else:
+                    parsed_tx = self.parse_transaction(tx_value, tx_value.block_time)
+                if parsed_tx:
+                    parsed_tx['wallet'] = wallet_address
+                    new_transactions.append(parsed_tx)
+                if not gap:
+                    last_processed = tx_info
+            metrics.PARSE_SECONDS.observe(time.perf_counter() - parse_started)
+        
+            if new_transactions:
+                self.history.save_history(new_transactions)
+                metrics.TRANSACTIONS.inc('poll', amount=len(new_transactions))
+                if metrics.REGISTRY.enabled:
+                    now = time.time()
+                    for tx in new_transactions:
+                        if tx.get('block_time'):
+                            metrics.DETECTION_LAG.observe(now - tx['block_time'])
+                await self.events.publish([transaction_event(tx) for tx in new_transactions])
+                self.value_later(new_transactions)
+
+            if last_processed:
+                self.cursors.update(
+                    wallet_address,
+                    str(last_processed.signature),
+                    last_processed.slot
+                )
+            return len(signatures)
                 
-                if len(pre_balances) > 0 and len(post_balances) > 0:
-                    sol_transfer = (post_balances[0] - pre_balances[0]) / 1e9
-                    if sol_transfer != 0:
-                        parsed_tx['sol_transfer'] = sol_transfer
-                        parsed_tx['type'] = 'sol_transfer'
-
-                if tx_data.meta.pre_token_balances and tx_data.meta.post_token_balances:
-                    for pre, post in zip(tx_data.meta.pre_token_balances, tx_data.meta.post_token_balances):
-                        if pre and post and pre.owner == post.owner:
-                            amount = (post.ui_token_amount.ui_amount or 0) - (pre.ui_token_amount.ui_amount or 0)
-                            if amount != 0:
-                                parsed_tx['token_transfers'].append({
-                                    'amount': amount,
-                                    'mint': str(pre.mint),
-                                    'owner': str(pre.owner)
-                                })
-                                parsed_tx['type'] = 'token_transfer'
-
-            return parsed_tx
         except Exception as e:
-            print(f"Error parsing transaction: {e}")
-            return None
+            print(f"Error monitoring wallet {wallet}: {e}")
+            await self.events.publish([Event("error", wallet=wallet_address, message=str(e))])
+            return 0
+        finally:
+            metrics.POLL_SECONDS.observe(time.perf_counter() - poll_started)
+
+    def value_later(self, transactions: List[Dict[str, Any]]):
+        """Value stored transactions in the background, if enabled, and store their values."""
+        if self.valuator is None or not transactions:
+            return
+        task = asyncio.create_task(self._value_and_store(transactions))
+        self.valuation_tasks.add(task)
+        task.add_done_callback(self.valuation_tasks.discard)
+
+    async def _value_and_store(self, transactions: List[Dict[str, Any]]):
+        loop = asyncio.get_running_loop()
+        delays = iter(self.VALUATION_RETRY_DELAYS)
+        while True:
+            # The worker thread values copies, so nothing on the event loop
+            # ever sees a transaction dict change mid-read
+            copies = [dict(tx, token_transfers=[dict(transfer) for transfer in tx.get('token_transfers') or ()])
+                      for tx in transactions]
+            started = time.perf_counter()
+            try:
+                missing = await loop.run_in_executor(self.valuator.executor, self._value_batch, copies)
+            except RuntimeError:
+                return  # executor shut down by close()
+            metrics.VALUATION_SECONDS.observe(time.perf_counter() - started)
+            for tx, valued in zip(transactions, copies):
+                tx.update(valued)
+            if not missing:
+                return
+            delay = next(delays, None)
+            if delay is None:
+                print(f"Could not value {len(transactions)} transactions, no prices for: "
+                      f"{', '.join(sorted(missing))}")
+                return
+            # Missing quotes have been requested meanwhile; failed history
+            # lookups are simply tried again
+            await asyncio.sleep(delay)
+
+    def _value_batch(self, transactions: List[Dict[str, Any]]) -> Set[str]:
+        changed, missing = self.valuator.value_transactions(transactions)
+        if changed:
+            self.history.backend.replace(changed)
+        return missing
+
+    def reparse_from_cache(self, batch_size: int = 1000, progress=None) -> int:
+        """Re-run the parser over every cached transaction and rewrite the history.
+
+        Reads the cache sequentially and never touches the network, so it is
+        bound by disk speed. Wallets and USD values recorded for existing
+        transactions are kept. Returns the number of transactions rewritten.
+        """
+        if self.tx_cache is None:
+            return 0
+        count = 0
+        batch = []
+        for _, result in self.tx_cache:
+            batch.append(result)
+            if len(batch) >= batch_size:
+                count += self._replace_parsed(batch)
+                batch = []
+                if progress:
+                    progress(count)
+        count += self._replace_parsed(batch)
+        self.history.load_history()
+        self.history.columnar_view = None
+        return count
+
+    def _replace_parsed(self, results: List[Dict]) -> int:
+        parsed = [tx for tx in parse_raw_transactions(results) if tx]
+        if parsed:
+            stored = self.history.backend.get_many([tx['signature'] for tx in parsed])
+            for tx in parsed:
+                if tx['signature'] in stored:
+                    _carry_valuation(stored[tx['signature']], tx)
+            self.history.backend.replace(parsed)
+        return len(parsed)
+
+    def parse_transaction(self, tx_data, block_time):
+        return parse_transaction(tx_data, block_time)
 
     def format_transaction_display(self, transaction: Dict[str, Any]) -> str:
         try:
@@ -175,7 +551,14 @@ class TransactionMonitor:
 
     async def close(self):
         await self.stop_monitoring()
-        await self.client.close()
+        for task in list(self.valuation_tasks):
+            task.cancel()
+        if self.valuator is not None:
+            self.valuator.close()
+        await self.events.close()
+        await self.pool.close()
+        if self.tx_cache is not None:
+            self.tx_cache.close()
 
     def get_transaction_history(self, days=None):
         try:
@@ -183,10 +566,7 @@ class TransactionMonitor:
                 return self.history.transactions
             
             cutoff_time = datetime.now(timezone.utc) - timedelta(days=days)
-            return [
-                tx for tx in self.history.transactions 
-                if datetime.fromisoformat(tx['timestamp']) > cutoff_time
-            ]
+            return self.history.get_range(cutoff_time.timestamp())
         except Exception as e:
             print(f"Error getting transaction history: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Lower values are served first when requests queue up on a bucket
+PRIORITY_LIVE = 0
+PRIORITY_BACKFILL = 1
+PRIORITY_METADATA = 2
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts up to ``burst``.
+
+    Waiting requests are granted in priority order, then FIFO. ``backoff``
+    pauses the bucket (for ``Retry-After`` or an exponentially growing delay)
+    and halves the rate; each ``on_success`` wins back a little of it, so the
+    bucket settles just under what the provider tolerates.
+    """
+
+    def __init__(self, rate: float, burst: float = None, min_rate: float = None,
+                 max_backoff: float = 60.0):
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.backoff_delay = 0.0
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self.counter = itertools.count()
+        self.dispatcher = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try_take(self, tokens: float) -> float:
+        """Take ``tokens`` if available and return 0, else return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            # A request larger than the bucket is let through once the bucket
+            # is full and leaves it in debt, so every call it carries is
+            # still paid for before the next request goes out
+            needed = min(tokens, self.capacity)
+            if self.tokens >= needed:
+                self.tokens -= tokens
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1, priority: int = PRIORITY_LIVE):
+        if not self.waiters and self._try_take(tokens) == 0.0:
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), tokens, future))
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self.waiters:
+            priority, _, tokens, future = self.waiters[0]
+            if future.cancelled():
+                heapq.heappop(self.waiters)
+                continue
+            wait = self._try_take(tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self.waiters)
+            future.set_result(None)
+
+    def paused_for(self) -> float:
+        """Seconds until the bucket's current pause ends, 0 when it is not paused."""
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """Pause after a 429 and cut the rate in half."""
+        with self.lock:
+            self.backoff_delay = min(self.max_backoff, self.backoff_delay * 2 or 1.0)
+            delay = retry_after if retry_after is not None else self.backoff_delay
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self):
+        with self.lock:
+            self.backoff_delay = 0.0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+class RateLimits:
+    """Token buckets per endpoint and per (endpoint, method) pair.
+
+    Every request takes a token from its endpoint's bucket and, when a rate
+    is configured for its method in ``method_rates``, from that method's
+    bucket on the same endpoint as well.
+    """
+
+    def __init__(self, endpoint_rate: float = 10.0, method_rates: Optional[Dict[str, float]] = None):
+        self.endpoint_rate = endpoint_rate
+        self.method_rates = method_rates or {}
+        self.buckets: Dict[Tuple[str, Optional[str]], RateLimiter] = {}
+
+    def buckets_for(self, endpoint: str, method: str) -> List[RateLimiter]:
+        keys = [(endpoint, None)]
+        if method in self.method_rates:
+            keys.append((endpoint, method))
+        buckets = []
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                rate = self.endpoint_rate if key[1] is None else self.method_rates[key[1]]
+                bucket = self.buckets[key] = RateLimiter(rate)
+            buckets.append(bucket)
+        return buckets
+
+    async def acquire(self, endpoint: str, method: str, tokens: float = 1,
+                      priority: int = PRIORITY_LIVE):
+        for bucket in self.buckets_for(endpoint, method):
+            await bucket.acquire(tokens, priority)
+
+    def paused_for(self, endpoint: str, method: str = '') -> float:
+        """Seconds until requests for ``method`` may go to ``endpoint`` again after a 429."""
+        keys = [(endpoint, None), (endpoint, method)]
+        return max((self.buckets[key].paused_for() for key in keys if key in self.buckets), default=0.0)
+
+    def backoff(self, endpoint: str, method: str, retry_after: Optional[float] = None):
+        for bucket in self.buckets_for(endpoint, method):
+            bucket.backoff(retry_after)
+
+    def on_success(self, endpoint: str, method: str):
+        for bucket in self.buckets_for(endpoint, method):
+            bucket.on_success()
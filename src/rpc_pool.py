@@ -0,0 +1,252 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import httpx
+import metrics
+from decoder import json_loads
+from ratelimit import PRIORITY_LIVE, RateLimits
+
+DEFAULT_ENDPOINTS = ["https://api.mainnet-beta.solana.com"]
+
+class RpcError(Exception):
+    """Raised when no endpoint in the pool could serve a request."""
+
+class RateLimitedError(RpcError):
+    """Raised when an endpoint answered HTTP 429 (or a JSON-RPC 429 error)."""
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _is_rate_limited(response: httpx.Response, result: Any) -> bool:
+    if response.status_code == 429:
+        return True
+    # Some providers answer 200 with a JSON-RPC error carrying code 429
+    return isinstance(result, dict) and (result.get('error') or {}).get('code') == 429
+
+def _method_and_size(body: Any) -> Tuple[str, int]:
+    """Method name and number of calls in a single or batch request body."""
+    if isinstance(body, list):
+        return (body[0]['method'] if body else ''), len(body)
+    return body['method'], 1
+
+class EndpointStats:
+    """Rolling latency and error window for one endpoint."""
+
+    def __init__(self, url: str, window: int = 100):
+        self.url = url
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def record_slow(self, latency: float):
+        """Latency sample of a call cancelled unfinished; neither a success nor an error."""
+        self.latencies.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+class RpcPool:
+    """Routes JSON-RPC calls across several endpoints by observed health.
+
+    Each endpoint keeps a rolling window of latencies and failures. Calls go
+    to the healthy endpoint with the lowest median latency and fail over to
+    the next one on a transport error, timeout or HTTP error. Endpoints whose
+    error rate exceeds ``max_error_rate`` are parked for ``cooldown`` seconds.
+    With ``hedge=True`` a duplicate request is sent to the second-best
+    endpoint once the first has been outstanding longer than its p95 latency,
+    and whichever answers first wins.
+
+    When ``rate_limits`` is given, every call first takes tokens from its
+    endpoint and method buckets in ``priority`` order, and a 429 answer backs
+    those buckets off before the call fails over to the next endpoint.
+    Endpoints pausing for ``Retry-After`` rank behind the ones that are not;
+    if every endpoint is rate limited the call is retried after the backoff.
+    """
+
+    def __init__(self, endpoints: Sequence[str] = DEFAULT_ENDPOINTS, window: int = 100,
+                 max_error_rate: float = 0.5, cooldown: float = 30.0, timeout: float = 30.0,
+                 default_hedge_delay: float = 1.0, rate_limits: Optional[RateLimits] = None,
+                 rate_limit_retries: int = 2):
+        if not endpoints:
+            raise ValueError("RpcPool needs at least one endpoint")
+        self.stats = {url: EndpointStats(url, window) for url in endpoints}
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.default_hedge_delay = default_hedge_delay
+        self.rate_limits = rate_limits
+        self.rate_limit_retries = rate_limit_retries
+        self.ids = itertools.count(1)
+        self.http = None
+
+    def ranked(self, method: str = '') -> List[EndpointStats]:
+        """Endpoints in the order they should be tried for ``method``."""
+        now = time.monotonic()
+
+        def score(stats: EndpointStats) -> Tuple:
+            if stats.cooldown_until and stats.cooldown_until <= now:
+                # Cooldown is over: forget the old failures and try it again
+                stats.cooldown_until = 0.0
+                stats.outcomes.clear()
+                stats.latencies.clear()
+            parked = stats.cooldown_until > now
+            median = stats.percentile(0.5)
+            if not stats.outcomes and not stats.latencies:
+                # Untried endpoints sort first so they get measured
+                latency = 0.0
+            else:
+                latency = median if median is not None else float('inf')
+            # An endpoint pausing after a 429 only goes first if all of them are
+            return (parked, self._paused_for(stats, method), latency * (1 + stats.error_rate),
+                    stats.error_rate)
+
+        return sorted(self.stats.values(), key=score)
+
+    def _paused_for(self, stats: EndpointStats, method: str) -> float:
+        return self.rate_limits.paused_for(stats.url, method) if self.rate_limits else 0.0
+
+    def _record(self, stats: EndpointStats, started: float, ok: bool,
+                method: str = '', error: Optional[Exception] = None):
+        latency = time.monotonic() - started
+        stats.record(latency, ok)
+        if ok:
+            metrics.RPC_SECONDS.observe(latency, method)
+        else:
+            reason = 'rate_limited' if isinstance(error, RateLimitedError) else 'error'
+            metrics.RPC_ERRORS.inc(method, reason)
+        if not ok and len(stats.outcomes) >= 5 and stats.error_rate > self.max_error_rate:
+            stats.cooldown_until = time.monotonic() + self.cooldown
+
+    def _body(self, method: str, params: list) -> Dict:
+        return {"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": params}
+
+    def _check_response(self, stats: EndpointStats, method: str, response: httpx.Response) -> Any:
+        result = json_loads(response.content) if response.status_code != 429 else None
+        if _is_rate_limited(response, result):
+            if self.rate_limits:
+                self.rate_limits.backoff(stats.url, method, _retry_after(response))
+            raise RateLimitedError(f"{stats.url} rate limited {method}")
+        response.raise_for_status()
+        if self.rate_limits:
+            self.rate_limits.on_success(stats.url, method)
+        return result
+
+    async def _post(self, stats: EndpointStats, body: Any, priority: int = PRIORITY_LIVE,
+                    acquired: bool = False) -> Any:
+        if self.http is None:
+            self.http = httpx.AsyncClient(timeout=self.timeout)
+        method, tokens = _method_and_size(body)
+        if self.rate_limits and not acquired:
+            await self.rate_limits.acquire(stats.url, method, tokens, priority)
+        started = time.monotonic()
+        try:
+            response = await self.http.post(stats.url, json=body)
+            result = self._check_response(stats, method, response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._record(stats, started, False, method, e)
+            raise
+        self._record(stats, started, True, method)
+        return result
+
+    async def _post_with_failover(self, body: Any, candidates: List[EndpointStats],
+                                  priority: int = PRIORITY_LIVE) -> Any:
+        method, _ = _method_and_size(body)
+        last_error = None
+        for attempt in range(1 + self.rate_limit_retries):
+            if attempt:
+                # Endpoints whose Retry-After ends soonest are retried first
+                candidates = sorted(candidates, key=lambda stats: self._paused_for(stats, method))
+            for stats in candidates:
+                try:
+                    return await self._post(stats, body, priority)
+                except Exception as e:
+                    last_error = e
+            # Only go around again when rate limiting was the last problem;
+            # the backed-off buckets make the retry wait out Retry-After
+            if not (self.rate_limits and isinstance(last_error, RateLimitedError)):
+                break
+        raise RpcError(f"All RPC endpoints failed: {last_error}")
+
+    async def request(self, method: str, params: list, hedge: bool = False,
+                      priority: int = PRIORITY_LIVE) -> Dict:
+        """Send one call and return the raw JSON-RPC response object."""
+        body = self._body(method, params)
+        candidates = self.ranked(method)
+        if not hedge or len(candidates) < 2:
+            return await self._post_with_failover(body, candidates, priority)
+
+        primary, secondary = candidates[0], candidates[1]
+        delay = primary.percentile(0.95) or self.default_hedge_delay
+        # The hedge delay measures the request, not its wait for a rate limit token
+        if self.rate_limits:
+            await self.rate_limits.acquire(primary.url, method, 1, priority)
+        first = asyncio.create_task(self._post(primary, body, priority, acquired=True))
+        started = {first: (primary, time.monotonic())}
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done and not first.exception():
+            return first.result()
+
+        # Primary is slow or already failed: race it against the secondary
+        second = asyncio.create_task(self._post(secondary, body, priority))
+        started[second] = (secondary, time.monotonic())
+        pending = {first, second}
+        if done:
+            pending.discard(first)
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        now = time.monotonic()
+                        won_in = now - started[task][1]
+                        for loser in pending:
+                            # The loser gets cancelled below; all that is known is
+                            # that it would have been slower than the winner
+                            stats, loser_started = started[loser]
+                            stats.record_slow(max(now - loser_started, won_in))
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        # Both raced endpoints failed, fall back to the rest of the pool
+        if len(candidates) > 2:
+            return await self._post_with_failover(body, candidates[2:], priority)
+        raise RpcError(f"All RPC endpoints failed: {last_error}")
+
+    async def batch(self, calls: List[Tuple[str, list]],
+                    priority: int = PRIORITY_LIVE) -> List[Optional[Dict]]:
+        """Send calls as one JSON-RPC batch; responses are returned in call order."""
+        body = [self._body(method, params) for method, params in calls]
+        items = await self._post_with_failover(body, self.ranked(calls[0][0] if calls else ''), priority)
+        by_id = {item.get('id'): item for item in items if isinstance(item, dict)} \
+            if isinstance(items, list) else {}
+        return [by_id.get(call['id']) for call in body]
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+class PollScheduler:
+    """Schedules polls for many keys (wallets) from a single task.
+
+    Each key has its own interval: a poll that finds new activity resets it to
+    ``min_interval``, and each quiet poll multiplies it by ``backoff`` up to
+    ``max_interval``. At most ``max_concurrency`` polls run at once, and a key
+    is never polled concurrently with itself.
+    """
+
+    def __init__(self, poll: Callable[[str], Awaitable[int]], min_interval: float = 2.0,
+                 max_interval: float = 60.0, backoff: float = 2.0, max_concurrency: int = 16):
+        self.poll = poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.intervals: Dict[str, float] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.generations: Dict[str, int] = {}
+        self.in_flight: Set[str] = set()
+        self.pending_wakes: Set[str] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.wakeup = asyncio.Event()
+        self.running = False
+        self.counter = 0
+
+    def add(self, key: str):
+        if key in self.intervals:
+            return
+        self.intervals[key] = self.min_interval
+        self._schedule(key, 0)
+
+    def remove(self, key: str):
+        self.intervals.pop(key, None)
+        self.generations.pop(key, None)
+        self.pending_wakes.discard(key)
+
+    def wake(self, key: str):
+        """Poll ``key`` as soon as possible and reset its interval."""
+        if key not in self.intervals:
+            return
+        self.intervals[key] = self.min_interval
+        if key in self.in_flight:
+            # Re-poll once the running poll finishes, it may have missed the news
+            self.pending_wakes.add(key)
+        else:
+            self._schedule(key, 0)
+
+    def wake_all(self):
+        for key in list(self.intervals):
+            self.wake(key)
+
+    def _schedule(self, key: str, delay: float):
+        # Bumping the generation invalidates any older heap entry for this key
+        self.counter += 1
+        self.generations[key] = self.counter
+        heapq.heappush(self.heap, (time.monotonic() + delay, self.counter, key))
+        self.wakeup.set()
+
+    async def run(self):
+        self.running = True
+        try:
+            while self.running:
+                while self.heap and self.generations.get(self.heap[0][2]) != self.heap[0][1]:
+                    heapq.heappop(self.heap)
+
+                self.wakeup.clear()
+                if not self.heap:
+                    await self.wakeup.wait()
+                    continue
+
+                delay = self.heap[0][0] - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self.semaphore.acquire()
+                # The heap may have changed while waiting for a free slot
+                if not self.heap or self.heap[0][0] > time.monotonic():
+                    self.semaphore.release()
+                    continue
+                _, generation, key = heapq.heappop(self.heap)
+                if self.generations.get(key) != generation:
+                    self.semaphore.release()
+                    continue
+                self.generations.pop(key, None)
+                self.in_flight.add(key)
+                task = asyncio.create_task(self._run_poll(key))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        finally:
+            self.running = False
+            for task in list(self.tasks):
+                task.cancel()
+
+    async def _run_poll(self, key: str):
+        found = 0
+        try:
+            found = await self.poll(key)
+        except Exception as e:
+            print(f"Error polling {key}: {e}")
+        finally:
+            self.semaphore.release()
+            self.in_flight.discard(key)
+
+        if key not in self.intervals:
+            return
+        if key in self.pending_wakes:
+            self.pending_wakes.discard(key)
+            self._schedule(key, 0)
+            return
+        if found:
+            self.intervals[key] = self.min_interval
+        else:
+            self.intervals[key] = min(self.max_interval, self.intervals[key] * self.backoff)
+        self._schedule(key, self.intervals[key])
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
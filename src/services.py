@@ -1,60 +1,305 @@
 import requests
-from typing import Optional, Dict, List
-from solana.rpc.api import Client
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Set, Tuple
 from models import TokenMetadata  # Regular import, not relative
 
+@dataclass
+class PriceQuote:
+    price: float
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the price was fetched."""
+        return time.time() - self.fetched_at
+
 class PriceTracker:
-    def __init__(self):
-        self.prices: Dict[str, float] = {}
+    """USD prices from CoinGecko with per-token TTL and background refresh.
+
+    ``get_price``/``get_quote`` never block: they return the cached value,
+    however old (the quote carries its age), and queue a refresh when it is
+    past ``ttl``. Refreshes are chunked to stay within the API's URL limits,
+    ids already being fetched are not requested twice, and HTTP 429 responses
+    pause all requests for ``Retry-After`` seconds or an exponential backoff.
+    """
+
+    def __init__(self, ttl: float = 60.0, chunk_size: int = 100, max_url_ids_length: int = 1500,
+                 timeout: float = 10.0):
+        self.quotes: Dict[str, PriceQuote] = {}
         self.coingecko_base_url = "https://api.coingecko.com/api/v3"
-        
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self.max_url_ids_length = max_url_ids_length
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        # ids currently being fetched, so concurrent requests share one call
+        self.in_flight: Dict[str, threading.Event] = {}
+        self.queued: Set[str] = set()
+        self.backoff = 0.0
+        self.backoff_until = 0.0
+        self.worker = None
+
+    def _chunks(self, token_ids: List[str]) -> List[List[str]]:
+        chunks, chunk, length = [], [], 0
+        for token_id in token_ids:
+            if chunk and (len(chunk) >= self.chunk_size
+                          or length + len(token_id) + 1 > self.max_url_ids_length):
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(token_id)
+            length += len(token_id) + 1
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def is_stale(self, token_id: str) -> bool:
+        quote = self.quotes.get(token_id)
+        return quote is None or quote.age > self.ttl
+
+    def _get(self, path: str, params: Dict[str, str]) -> Optional[requests.Response]:
+        """GET from the price API; returns None if the request was rate limited."""
+        delay = self.backoff_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.get(f"{self.coingecko_base_url}{path}", params=params, timeout=self.timeout)
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After')
+            self.backoff = min(300.0, self.backoff * 2 if self.backoff else 5.0)
+            wait = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff
+            self.backoff_until = time.time() + wait
+            print(f"Price API rate limited, backing off for {wait:.0f}s")
+            return None
+        if response.status_code == 200:
+            self.backoff = 0.0
+        return response
+
+    def _fetch_chunk(self, token_ids: List[str]) -> bool:
+        """Fetch one chunk of prices; returns False if it was rate limited."""
+        response = self._get("/simple/price", {
+            "ids": ",".join(token_ids),
+            "vs_currencies": "usd"
+        })
+        if response is None:
+            return False
+        if response.status_code == 200:
+            data = response.json()
+            now = time.time()
+            for token_id in token_ids:
+                if token_id in data and "usd" in data[token_id]:
+                    self.quotes[token_id] = PriceQuote(data[token_id]["usd"], now)
+        return True
+
+    def price_history(self, token_id: str, start: float, end: float) -> Optional[List[Tuple[float, float]]]:
+        """``(timestamp, price)`` points between two epoch timestamps, in one request.
+
+        The API picks the resolution from the range length (minutely for a
+        day, hourly up to 90 days, daily beyond). Returns None if the request
+        failed or stayed rate limited.
+        """
+        params = {"vs_currency": "usd", "from": str(int(start)), "to": str(int(end))}
+        try:
+            response = self._get(f"/coins/{token_id}/market_chart/range", params)
+            if response is None:
+                response = self._get(f"/coins/{token_id}/market_chart/range", params)
+            if response is None or response.status_code != 200:
+                return None
+            return [(timestamp / 1000, price) for timestamp, price in response.json().get("prices", [])]
+        except Exception as e:
+            print(f"Error fetching price history for {token_id}: {e}")
+            return None
+
     def update_prices(self, token_ids: List[str]):
-        """Update prices for multiple tokens at once."""
+        """Fetch stale prices for multiple tokens now, blocking until done."""
         if not token_ids:
             return
+
+        with self.lock:
+            to_fetch = [token_id for token_id in dict.fromkeys(token_ids)
+                        if self.is_stale(token_id) and token_id not in self.in_flight]
+            waiting = [self.in_flight[token_id] for token_id in set(token_ids)
+                       if token_id in self.in_flight]
+            done = threading.Event()
+            for token_id in to_fetch:
+                self.in_flight[token_id] = done
             
         try:
-            ids_string = ",".join(token_ids)
-            response = requests.get(
-                f"{self.coingecko_base_url}/simple/price",
-                params={
-                    "ids": ids_string,
-                    "vs_currencies": "usd"
-                }
-            )
-            if response.status_code == 200:
-                data = response.json()
-                for token_id in token_ids:
-                    if token_id in data:
-                        self.prices[token_id] = data[token_id]["usd"]
+            for chunk in self._chunks(to_fetch):
+                # A rate-limited chunk is retried once after the backoff
+                if not self._fetch_chunk(chunk):
+                    self._fetch_chunk(chunk)
         except Exception as e:
             print(f"Error updating prices: {e}")
+        finally:
+            with self.lock:
+                for token_id in to_fetch:
+                    self.in_flight.pop(token_id, None)
+            done.set()
+
+        for event in waiting:
+            event.wait(self.timeout)
+
+    def request_prices(self, token_ids: List[str]):
+        """Queue a background refresh for any of the given prices that are stale."""
+        with self.lock:
+            stale = {token_id for token_id in token_ids if self.is_stale(token_id)}
+            if not stale - self.queued:
+                return
+            self.queued |= stale
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._refresh_loop, daemon=True)
+                self.worker.start()
+            self.wakeup.notify()
+
+    def _refresh_loop(self):
+        while True:
+            with self.lock:
+                while not self.queued:
+                    if not self.wakeup.wait(60):
+                        # Idle for a minute, let the thread exit
+                        if not self.queued:
+                            self.worker = None
+                            return
+                token_ids = list(self.queued)
+                self.queued.clear()
+            self.update_prices(token_ids)
+
+    def get_quote(self, token_id: str) -> Optional[PriceQuote]:
+        """Cached price with its age; queues a refresh if it is stale."""
+        if self.is_stale(token_id):
+            self.request_prices([token_id])
+        return self.quotes.get(token_id)
     
     def get_price(self, token_id: str) -> Optional[float]:
-        return self.prices.get(token_id)
+        quote = self.get_quote(token_id)
+        return quote.price if quote else None
 
 class TokenRegistry:
-    def __init__(self):
-        self.client = Client("https://api.mainnet-beta.solana.com")
+    """Token metadata backed by a local SQLite copy of the Jupiter token list.
+
+    Startup only opens the local cache, so it works offline and costs
+    nothing; if the cache is missing or older than ``ttl`` it is revalidated
+    in a background thread using the ETag from the last download. Lookups
+    hit a small in-memory dict first and then the mint-keyed table, so the
+    full list is never parsed on the lookup path.
+    """
+
+    TOKEN_LIST_URL = "https://token.jup.ag/all"
+
+    def __init__(self, cache_file: str = "token_registry.db", ttl: float = 24 * 3600,
+                 background: bool = True):
         self.tokens: Dict[str, TokenMetadata] = {}
-        self.load_token_list()
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.conn = sqlite3.connect(cache_file, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tokens (
+                    address TEXT PRIMARY KEY,
+                    name TEXT,
+                    symbol TEXT,
+                    decimals INTEGER,
+                    coingecko_id TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+        if self.is_stale():
+            if background:
+                self.refresh_async()
+            else:
+                self.load_token_list()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self) -> bool:
+        fetched_at = self._get_meta('fetched_at')
+        return fetched_at is None or time.time() - float(fetched_at) > self.ttl
+
+    def refresh_async(self):
+        """Revalidate the cached token list in a background thread."""
+        if self.refresh_thread and self.refresh_thread.is_alive():
+            return
+        self.refresh_thread = threading.Thread(target=self.load_token_list, daemon=True)
+        self.refresh_thread.start()
         
     def load_token_list(self):
-        """Load token list from Jupiter API."""
+        """Load token list from Jupiter API into the local cache."""
         try:
-            response = requests.get("https://token.jup.ag/all")
-            if response.status_code == 200:
+            headers = {}
+            etag = self._get_meta('etag')
+            if etag:
+                headers['If-None-Match'] = etag
+            response = requests.get(self.TOKEN_LIST_URL, headers=headers, timeout=60)
+
+            if response.status_code == 304:
+                with self.lock, self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)",
+                        (str(time.time()),)
+                    )
+            elif response.status_code == 200:
                 tokens = response.json()
-                for token in tokens:
-                    self.tokens[token['address']] = TokenMetadata(
-                        address=token['address'],
-                        name=token.get('name', ''),
-                        symbol=token.get('symbol', ''),
-                        decimals=token.get('decimals', 9),
-                        coingecko_id=token.get('coingeckoId', '')
+                rows = [
+                    (
+                        token['address'],
+                        token.get('name', ''),
+                        token.get('symbol', ''),
+                        token.get('decimals', 9),
+                        token.get('coingeckoId', '') or ''
                     )
+                    for token in tokens
+                ]
+                with self.lock, self.conn:
+                    self.conn.execute("DELETE FROM tokens")
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)", rows
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_at', ?)",
+                        (str(time.time()),)
+                    )
+                    if response.headers.get('ETag'):
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO meta (key, value) VALUES ('etag', ?)",
+                            (response.headers['ETag'],)
+                        )
+                    # Lookups cached before the refresh may be outdated now
+                    self.tokens.clear()
+            else:
+                print(f"Error loading token list: HTTP {response.status_code}")
         except Exception as e:
             print(f"Error loading token list: {e}")
 
     def get_token_info(self, mint_address: str) -> TokenMetadata:
-        return self.tokens.get(mint_address, TokenMetadata(address=mint_address))
\ No newline at end of file
+        token = self.tokens.get(mint_address)
+        if token is not None:
+            return token
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT address, name, symbol, decimals, coingecko_id FROM tokens WHERE address = ?",
+                (mint_address,)
+            ).fetchone()
+        if row is None:
+            return TokenMetadata(address=mint_address)
+
+        token = TokenMetadata(
+            address=row[0],
+            name=row[1],
+            symbol=row[2],
+            decimals=row[3],
+            coingecko_id=row[4]
+        )
+        self.tokens[mint_address] = token
+        return token
@@ -0,0 +1,362 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+def transaction_key(tx: Dict) -> str:
+    """Dedupe key for a stored transaction: its signature, else a content hash."""
+    signature = tx.get('signature')
+    if signature:
+        return str(signature)
+    return hashlib.sha1(json.dumps(tx, sort_keys=True, default=str).encode()).hexdigest()
+
+def transaction_timestamp(tx: Dict) -> Optional[float]:
+    """Epoch seconds of a transaction from its ``block_time`` or ``timestamp``.
+
+    Handles both the ISO timestamps written by the monitor and the
+    ``%Y-%m-%d %H:%M:%S`` local times used by ``models``.
+    """
+    block_time = tx.get('block_time')
+    if isinstance(block_time, (int, float)):
+        return float(block_time)
+    timestamp = tx.get('timestamp')
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp).timestamp()
+        except ValueError:
+            return None
+    return None
+
+class HistoryBackend:
+    """Append-only store of transaction dicts, deduplicated by ``transaction_key``."""
+
+    def append(self, transactions: List[Dict]) -> List[Dict]:
+        """Store the given transactions and return the ones that were new."""
+        raise NotImplementedError
+
+    def replace(self, transactions: List[Dict]):
+        """Overwrite stored transactions with new versions, inserting unknown ones.
+
+        A replaced transaction keeps its position and, when the new version
+        has none, its wallet. Derived state (indexes, rollups) is not updated.
+        """
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def contains_many(self, keys: Sequence[str]) -> Set[str]:
+        """The subset of ``keys`` that is stored."""
+        raise NotImplementedError
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Dict]:
+        """Stored transactions for whichever of ``keys`` are present."""
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over all stored transactions in insertion order."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def position(self) -> int:
+        """Opaque, increasing position of the most recently stored transaction."""
+        raise NotImplementedError
+
+    def iter_after(self, position: int) -> Iterator[Dict]:
+        """Iterate over transactions stored after ``position``, in insertion order."""
+        raise NotImplementedError
+
+    def iter_filtered(self, after: int = 0, start: Optional[float] = None, end: Optional[float] = None,
+                      wallets: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, Dict]]:
+        """Iterate ``(version, transaction)`` pairs written or rewritten after version ``after``,
+        in the order they were written, keeping those whose timestamp is within
+        ``start``..``end`` (inclusive) and whose wallet is one of ``wallets``.
+
+        Every ``append`` and ``replace`` gives the rows it writes a new, higher
+        version, so a rewritten transaction comes up again."""
+        raise NotImplementedError
+
+    def load_rollups(self) -> Tuple[int, List[Tuple[str, int, Dict]]]:
+        """Return the persisted rollup position and ``(granularity, bucket, data)`` rows."""
+        return 0, []
+
+    def save_rollups(self, rows: List[Tuple[str, int, Dict]], position: int):
+        """Upsert changed rollup buckets together with the position they cover."""
+        pass
+
+    def load_cursors(self) -> Dict[str, Dict]:
+        """Return the persisted ``{wallet: {'signature': ..., 'slot': ...}}`` poll cursors."""
+        return {}
+
+    def save_cursor(self, wallet: str, signature: str, slot: int):
+        """Upsert the poll cursor of one wallet."""
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class SQLiteBackend(HistoryBackend):
+    """History stored in SQLite in WAL mode.
+
+    Each write is a single transaction inserting only the new rows, and the
+    unique signature column doubles as the persistent dedupe index, so the
+    cost of a write is proportional to the batch, not to the history size.
+    A crash mid-write rolls back cleanly instead of corrupting the store.
+    Rows also carry the ``version`` they were last written at, for readers
+    that need rewritten rows as well as new ones.
+    """
+
+    CHUNK_SIZE = 1000
+
+    def __init__(self, filename: str = "transaction_history.db", json_encoder=None):
+        self.filename = filename
+        self.json_encoder = json_encoder
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    seq INTEGER PRIMARY KEY,
+                    signature TEXT NOT NULL UNIQUE,
+                    wallet TEXT,
+                    block_time REAL,
+                    data TEXT NOT NULL,
+                    version INTEGER
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(transactions)")]
+            if 'version' not in columns:
+                # Stores from before versions: every row was last written when inserted
+                self.conn.execute("ALTER TABLE transactions ADD COLUMN version INTEGER")
+                self.conn.execute("UPDATE transactions SET version = seq")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions(block_time)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transactions_wallet ON transactions(wallet, seq)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transactions_version ON transactions(version)"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    granularity TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (granularity, bucket)
+                )
+            """)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self.version = self.conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM transactions"
+            ).fetchone()[0]
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cursors (
+                    wallet TEXT PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    slot INTEGER NOT NULL
+                )
+            """)
+
+    def append(self, transactions: List[Dict]) -> List[Dict]:
+        added = []
+        with self.lock, self.conn:
+            for tx in transactions:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO transactions (signature, wallet, block_time, data, version) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        transaction_key(tx),
+                        tx.get('wallet'),
+                        transaction_timestamp(tx),
+                        json.dumps(tx, cls=self.json_encoder),
+                        self.version + 1
+                    )
+                )
+                if cursor.rowcount:
+                    self.version += 1
+                    added.append(tx)
+        return added
+
+    def replace(self, transactions: List[Dict]):
+        with self.lock, self.conn:
+            for tx in transactions:
+                key = transaction_key(tx)
+                if tx.get('wallet') is None:
+                    row = self.conn.execute(
+                        "SELECT wallet FROM transactions WHERE signature = ?", (key,)
+                    ).fetchone()
+                    if row and row[0] is not None:
+                        tx['wallet'] = row[0]
+                self.version += 1
+                self.conn.execute(
+                    "INSERT INTO transactions (signature, wallet, block_time, data, version) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(signature) DO UPDATE SET "
+                    "wallet = excluded.wallet, block_time = excluded.block_time, data = excluded.data, "
+                    "version = excluded.version",
+                    (
+                        key,
+                        tx.get('wallet'),
+                        transaction_timestamp(tx),
+                        json.dumps(tx, cls=self.json_encoder),
+                        self.version
+                    )
+                )
+
+    def contains(self, key: str) -> bool:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM transactions WHERE signature = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def contains_many(self, keys: Sequence[str]) -> Set[str]:
+        found = set()
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = list(keys[i:i + 500])
+                found.update(row[0] for row in self.conn.execute(
+                    f"SELECT signature FROM transactions "
+                    f"WHERE signature IN ({','.join('?' * len(chunk))})", chunk
+                ))
+        return found
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Dict]:
+        found = {}
+        with self.lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = list(keys[i:i + 500])
+                for signature, data in self.conn.execute(
+                    f"SELECT signature, data FROM transactions "
+                    f"WHERE signature IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    found[signature] = json.loads(data)
+        return found
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_after(0)
+
+    def iter_after(self, position: int) -> Iterator[Dict]:
+        # Read in keyset-paginated chunks so the lock is never held while the
+        # caller consumes rows and memory stays bounded by the chunk size
+        last_seq = position
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT seq, data FROM transactions WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last_seq, self.CHUNK_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, data in rows:
+                yield json.loads(data)
+            last_seq = rows[-1][0]
+
+    def iter_filtered(self, after: int = 0, start: Optional[float] = None, end: Optional[float] = None,
+                      wallets: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, Dict]]:
+        # Filters are evaluated by SQLite, so rows that do not match are never
+        # decoded; paging is keyset pagination on the version, as in ``iter_after``
+        conditions, params = ["version > ?"], []
+        if start is not None:
+            conditions.append("block_time >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("block_time <= ?")
+            params.append(end)
+        if wallets:
+            conditions.append(f"wallet IN ({','.join('?' * len(wallets))})")
+            params.extend(wallets)
+        query = (f"SELECT version, data FROM transactions WHERE {' AND '.join(conditions)} "
+                 f"ORDER BY version LIMIT ?")
+        last_version = after
+        while True:
+            with self.lock:
+                rows = self.conn.execute(query, [last_version, *params, self.CHUNK_SIZE]).fetchall()
+            if not rows:
+                return
+            for version, data in rows:
+                yield version, json.loads(data)
+            last_version = rows[-1][0]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def position(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM transactions").fetchone()[0]
+
+    def load_rollups(self) -> Tuple[int, List[Tuple[str, int, Dict]]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM state WHERE name = 'rollups_position'"
+            ).fetchone()
+            rows = self.conn.execute("SELECT granularity, bucket, data FROM rollups").fetchall()
+        position = int(row[0]) if row else 0
+        return position, [(granularity, bucket, json.loads(data)) for granularity, bucket, data in rows]
+
+    def save_rollups(self, rows: List[Tuple[str, int, Dict]], position: int):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rollups (granularity, bucket, data) VALUES (?, ?, ?)",
+                [(granularity, bucket, json.dumps(data)) for granularity, bucket, data in rows]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO state (name, value) VALUES ('rollups_position', ?)",
+                (str(position),)
+            )
+
+    def load_cursors(self) -> Dict[str, Dict]:
+        with self.lock:
+            rows = self.conn.execute("SELECT wallet, signature, slot FROM cursors").fetchall()
+        return {wallet: {'signature': signature, 'slot': slot} for wallet, signature, slot in rows}
+
+    def save_cursor(self, wallet: str, signature: str, slot: int):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cursors (wallet, signature, slot) VALUES (?, ?, ?)",
+                (wallet, signature, slot)
+            )
+
+    def flush(self):
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+def migrate_legacy_history(legacy_filename: str, backend: HistoryBackend) -> int:
+    """Import a legacy whole-file JSON history into ``backend`` once.
+
+    The legacy file is renamed to ``<name>.migrated`` afterwards so the
+    import does not run again. Returns the number of transactions imported.
+    """
+    if not os.path.exists(legacy_filename):
+        return 0
+    try:
+        with open(legacy_filename, 'r') as f:
+            transactions = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error migrating history from {legacy_filename}: {e}")
+        return 0
+
+    added = backend.append(transactions)
+    os.replace(legacy_filename, f"{legacy_filename}.migrated")
+    print(f"Migrated {len(added)} transactions from {legacy_filename}")
+    return len(added)
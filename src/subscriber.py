@@ -0,0 +1,168 @@
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+class SubscriptionManager:
+    """Keeps websocket subscriptions open for a set of wallets.
+
+    Every wallet gets a ``logsSubscribe`` subscription (mentions filter) and,
+    with ``account_updates``, an ``accountSubscribe`` one as well. Any
+    notification for a wallet is reported through ``on_activity``. The
+    connection is re-established with exponential backoff after a failure,
+    all wallets are resubscribed, and ``on_status`` is called with the new
+    connection state so the caller can backfill gaps and fall back to polling.
+    A connection only counts as up once every subscription has been
+    acknowledged; a rejected subscription, or no answer within
+    ``subscribe_timeout``, drops it and tries again.
+    """
+
+    def __init__(self, ws_url: str, on_activity: Callable[[str], None],
+                 on_status: Optional[Callable[[bool], None]] = None,
+                 account_updates: bool = False, commitment: str = "confirmed",
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 subscribe_timeout: float = 10.0):
+        self.ws_url = ws_url
+        self.on_activity = on_activity
+        self.on_status = on_status
+        self.account_updates = account_updates
+        self.commitment = commitment
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscribe_timeout = subscribe_timeout
+        self.wallets: Set[str] = set()
+        self.websocket = None
+        self.connected = False
+        self.running = False
+        self.request_id = 0
+        # request id -> (wallet, method) until the subscription id comes back
+        self.pending: Dict[int, Tuple[str, str]] = {}
+        # subscription id -> (wallet, method) for live subscriptions
+        self.subscriptions: Dict[int, Tuple[str, str]] = {}
+        # subscribe requests rejected on the current connection
+        self.rejected: List[Tuple[str, str]] = []
+
+    def add(self, wallet: str):
+        if wallet in self.wallets:
+            return
+        self.wallets.add(wallet)
+        # Also while connecting, as the wallets may already have been subscribed
+        if self.websocket is not None:
+            asyncio.create_task(self._subscribe(wallet))
+
+    def remove(self, wallet: str):
+        self.wallets.discard(wallet)
+        for subscription_id, (sub_wallet, method) in list(self.subscriptions.items()):
+            if sub_wallet == wallet:
+                del self.subscriptions[subscription_id]
+                if self.websocket is not None:
+                    unsubscribe = method.replace('Subscribe', 'Unsubscribe')
+                    asyncio.create_task(self._send(unsubscribe, [subscription_id]))
+
+    async def _send(self, method: str, params: list) -> int:
+        self.request_id += 1
+        await self.websocket.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": self.request_id,
+            "method": method,
+            "params": params
+        }))
+        return self.request_id
+
+    async def _subscribe(self, wallet: str):
+        try:
+            request_id = await self._send("logsSubscribe", [
+                {"mentions": [wallet]}, {"commitment": self.commitment}
+            ])
+            self.pending[request_id] = (wallet, "logsSubscribe")
+            if self.account_updates:
+                request_id = await self._send("accountSubscribe", [
+                    wallet, {"commitment": self.commitment, "encoding": "base64"}
+                ])
+                self.pending[request_id] = (wallet, "accountSubscribe")
+        except Exception as e:
+            print(f"Error subscribing to {wallet}: {e}")
+
+    def _handle_message(self, message: Dict):
+        if 'id' in message:
+            target = self.pending.pop(message['id'], None)
+            if target is None:
+                return
+            if 'error' in message:
+                print(f"Subscription for {target[0]} failed: {message['error']}")
+                self.rejected.append(target)
+            elif target[0] in self.wallets:
+                self.subscriptions[message['result']] = target
+            return
+
+        params = message.get('params') or {}
+        target = self.subscriptions.get(params.get('subscription'))
+        if target:
+            self.on_activity(target[0])
+
+    def _handle_raw(self, raw):
+        messages = json.loads(raw)
+        if not isinstance(messages, list):
+            messages = [messages]
+        for message in messages:
+            self._handle_message(message)
+
+    async def _await_subscriptions(self, websocket):
+        """Read until every subscribe request is answered; early notifications are handled too."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.subscribe_timeout
+        while self.pending and not self.rejected:
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"{len(self.pending)} subscriptions not acknowledged "
+                                      f"within {self.subscribe_timeout:g}s")
+            self._handle_raw(raw)
+        if self.rejected:
+            raise ConnectionError(f"Subscription rejected for {self.rejected[0][0]}")
+
+    def _set_connected(self, connected: bool):
+        if self.connected == connected:
+            return
+        self.connected = connected
+        if self.on_status:
+            self.on_status(connected)
+
+    async def run(self):
+        # Imported here so polling-only setups never pay for it
+        import websockets
+
+        self.running = True
+        delay = self.reconnect_delay
+        while self.running:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20) as websocket:
+                    self.websocket = websocket
+                    self.pending.clear()
+                    self.subscriptions.clear()
+                    self.rejected.clear()
+                    for wallet in list(self.wallets):
+                        await self._subscribe(wallet)
+                    # Report the connection only once subscribed, so the
+                    # backfill it triggers leaves no window for missed events
+                    await self._await_subscriptions(websocket)
+                    self._set_connected(True)
+                    delay = self.reconnect_delay
+
+                    async for raw in websocket:
+                        self._handle_raw(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Websocket connection lost: {e}")
+            finally:
+                self.websocket = None
+                self._set_connected(False)
+
+            if self.running:
+                await asyncio.sleep(delay)
+                delay = min(self.max_reconnect_delay, delay * 2)
+
+    def stop(self):
+        self.running = False
+        if self.websocket is not None:
+            asyncio.create_task(self.websocket.close())
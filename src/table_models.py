@@ -0,0 +1,150 @@
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+import metrics
+
+COLUMNS = ["Time", "Signature", "Type", "SOL", "Token Transfers"]
+
+def format_row(tx: Dict[str, Any]) -> List[str]:
+    """Display text for one transaction, one string per column."""
+    try:
+        timestamp = datetime.fromisoformat(tx['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+    except (KeyError, TypeError, ValueError):
+        timestamp = ""
+    sol = tx.get('sol_transfer')
+    transfers = ", ".join(
+        f"{transfer['amount']} {transfer.get('symbol') or transfer.get('mint', 'Unknown')}"
+        for transfer in tx.get('token_transfers') or []
+    )
+    return [
+        timestamp,
+        tx.get('signature', ''),
+        tx.get('type', 'Unknown'),
+        f"{sol}" if sol is not None else "",
+        transfers
+    ]
+
+class TransactionTableModel(QAbstractTableModel):
+    """Read-only table of transactions, newest first.
+
+    Rows are formatted only when the view asks for them, so only the visible
+    part of the table is ever turned into text.
+    """
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def transaction(self, row: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return format_row(self.transaction(index.row()))[index.column()]
+
+class HistoryTableModel(TransactionTableModel):
+    """History query results, exposed to the view in chunks as it scrolls.
+
+    ``transactions`` is the oldest-first list returned by the history store;
+    it is not copied. The view only learns about ``chunk_size`` more rows each
+    time it scrolls near the end (``canFetchMore``/``fetchMore``).
+    """
+
+    def __init__(self, chunk_size: int = 500, parent=None):
+        super().__init__(parent)
+        self.chunk_size = chunk_size
+        self.transactions: Sequence[Dict] = []
+        self.loaded = 0
+        self.fetching = False
+
+    def set_transactions(self, transactions: Sequence[Dict]):
+        self.beginResetModel()
+        self.transactions = transactions
+        self.loaded = min(self.chunk_size, len(transactions))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self.fetching and self.loaded < len(self.transactions)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.chunk_size, len(self.transactions) - self.loaded)
+        if parent.isValid() or self.fetching or count <= 0:
+            return
+        # Views may ask for more while handling rowsInserted; one chunk at a time
+        self.fetching = True
+        try:
+            self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+            self.loaded += count
+            self.endInsertRows()
+        finally:
+            self.fetching = False
+
+    def transaction(self, row: int) -> Dict[str, Any]:
+        return self.transactions[len(self.transactions) - 1 - row]
+
+class LiveFeedModel(TransactionTableModel):
+    """Bounded live feed of the latest ``capacity`` transactions.
+
+    ``add`` only queues a transaction; queued ones are inserted as a single
+    batch at most every ``interval_ms`` (about 30 times a second by default),
+    and the oldest rows are dropped once the ring buffer is full.
+    """
+
+    def __init__(self, capacity: int = 1000, interval_ms: int = 33, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.rows = deque()
+        self.pending: List[Dict] = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+        metrics.QUEUE_DEPTH.set_function(lambda: len(self.pending), 'live_feed')
+
+    def add(self, tx: Dict[str, Any]):
+        self.pending.append(tx)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if not self.pending:
+            return
+        started = time.perf_counter()
+        batch = self.pending[-self.capacity:]
+        self.pending = []
+
+        overflow = len(self.rows) + len(batch) - self.capacity
+        if overflow > 0:
+            first = len(self.rows) - overflow
+            self.beginRemoveRows(QModelIndex(), first, len(self.rows) - 1)
+            for _ in range(overflow):
+                self.rows.pop()
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), 0, len(batch) - 1)
+        # extendleft reverses the batch, which puts its newest item on top
+        self.rows.extendleft(batch)
+        self.endInsertRows()
+        metrics.GUI_REFRESH_SECONDS.observe(time.perf_counter() - started, 'qt')
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows.clear()
+        self.pending = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def transaction(self, row: int) -> Dict[str, Any]:
+        return self.rows[row]
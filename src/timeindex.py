@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional
+from storage import transaction_timestamp
+
+class TimeIndex:
+    """Transactions kept in time order next to their pre-parsed epoch timestamps.
+
+    Timestamps are parsed once on insert, so range queries are a binary
+    search plus a slice instead of a scan that parses every timestamp.
+    Transactions without a usable timestamp are kept aside and only show up
+    in ``all()``.
+    """
+
+    def __init__(self, transactions: Iterable[Dict] = ()):
+        self.times: List[float] = []
+        self.transactions: List[Dict] = []
+        self.untimed: List[Dict] = []
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return len(self.transactions) + len(self.untimed)
+
+    def add(self, tx: Dict):
+        ts = transaction_timestamp(tx)
+        if ts is None:
+            self.untimed.append(tx)
+        elif not self.times or ts >= self.times[-1]:
+            self.times.append(ts)
+            self.transactions.append(tx)
+        else:
+            position = bisect_right(self.times, ts)
+            self.times.insert(position, ts)
+            self.transactions.insert(position, tx)
+
+    def extend(self, transactions: Iterable[Dict]):
+        timed = []
+        for tx in transactions:
+            ts = transaction_timestamp(tx)
+            if ts is None:
+                self.untimed.append(tx)
+            else:
+                timed.append((ts, tx))
+        if not timed:
+            return
+
+        last = self.times[-1] if self.times else float('-inf')
+        in_order = all(timed[i][0] <= timed[i + 1][0] for i in range(len(timed) - 1))
+        if in_order and timed[0][0] >= last:
+            self.times.extend(ts for ts, _ in timed)
+            self.transactions.extend(tx for _, tx in timed)
+            return
+
+        # Out-of-order bulk insert: one stable sort instead of many inserts
+        pairs = list(zip(self.times, self.transactions)) + timed
+        pairs.sort(key=itemgetter(0))
+        self.times = [ts for ts, _ in pairs]
+        self.transactions = [tx for _, tx in pairs]
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Transactions with ``start <= timestamp <= end``, oldest first."""
+        lo = bisect_left(self.times, start) if start is not None else 0
+        hi = bisect_right(self.times, end) if end is not None else len(self.times)
+        return self.transactions[lo:hi]
+
+    def between_exclusive(self, start: float, end: float) -> List[Dict]:
+        """Transactions with ``start < timestamp < end``, oldest first."""
+        return self.transactions[bisect_right(self.times, start):bisect_left(self.times, end)]
+
+    def since(self, start: float) -> List[Dict]:
+        return self.between(start, None)
+
+    def latest(self, count: int) -> List[Dict]:
+        """The ``count`` most recent transactions, oldest first."""
+        if count <= 0:
+            return []
+        return self.transactions[-count:]
+
+    def all(self) -> List[Dict]:
+        return self.untimed + self.transactions
@@ -0,0 +1,238 @@
+import argparse
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from decoder import json_dumps, json_loads
+
+# Record header: compressed payload length, signature length
+RECORD_HEADER = struct.Struct('>IH')
+
+class TransactionCache:
+    """On-disk cache of raw ``getTransaction`` results, keyed by signature.
+
+    Results are zlib-compressed and appended to numbered segment files; a
+    SQLite index maps each signature to its segment, offset and length, so a
+    lookup is one index query plus one read. Records are self-describing
+    (signature + payload), so ``__iter__`` can stream every cached result
+    sequentially, segment by segment, without touching the index. Once the
+    segments exceed ``max_bytes`` the oldest segments are deleted whole,
+    together with their index entries.
+    """
+
+    def __init__(self, directory: str = "tx_cache", max_bytes: int = 2 * 1024 ** 3,
+                 segment_bytes: int = 64 * 1024 ** 2, compression_level: int = 6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    signature TEXT PRIMARY KEY,
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_segment ON entries(segment)")
+        self.segments = self._scan_segments()
+        # Always append to a fresh segment, so a write torn by a crash can
+        # only ever be at the very end of a segment
+        self.active = max(self.segments, default=0) + 1
+        self.segments[self.active] = 0
+        self.writer = None
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}.bin")
+
+    def _scan_segments(self) -> Dict[int, int]:
+        segments = {}
+        for name in os.listdir(self.directory):
+            if name.startswith("segment-") and name.endswith(".bin"):
+                segment = int(name[len("segment-"):-len(".bin")])
+                segments[segment] = os.path.getsize(os.path.join(self.directory, name))
+        return segments
+
+    def _open_writer(self):
+        if self.writer is None:
+            self.writer = open(self._segment_path(self.active), 'ab')
+
+    def get_many(self, signatures: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached results for whichever of ``signatures`` are present."""
+        found = {}
+        if not signatures:
+            return found
+        with self.lock:
+            rows = []
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(signatures), 500):
+                chunk = list(signatures[i:i + 500])
+                rows.extend(self.conn.execute(
+                    f"SELECT signature, segment, offset, length FROM entries "
+                    f"WHERE signature IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            if self.writer is not None:
+                self.writer.flush()
+            # Read each segment in offset order to keep disk access sequential
+            rows.sort(key=lambda row: (row[1], row[2]))
+            handle, handle_segment = None, None
+            try:
+                for signature, segment, offset, length in rows:
+                    if segment != handle_segment:
+                        if handle:
+                            handle.close()
+                        handle, handle_segment = open(self._segment_path(segment), 'rb'), segment
+                    handle.seek(offset)
+                    try:
+                        found[signature] = json_loads(zlib.decompress(handle.read(length)))
+                    except (zlib.error, ValueError) as e:
+                        print(f"Error reading cached transaction {signature}: {e}")
+            except OSError as e:
+                print(f"Error reading transaction cache: {e}")
+            finally:
+                if handle:
+                    handle.close()
+        return found
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([signature]).get(signature)
+
+    def put_many(self, results: List[Tuple[str, Dict[str, Any]]]):
+        """Append ``(signature, result)`` pairs that are not cached yet."""
+        if not results:
+            return
+        with self.lock:
+            known = set()
+            for i in range(0, len(results), 500):
+                chunk = [signature for signature, _ in results[i:i + 500]]
+                known.update(row[0] for row in self.conn.execute(
+                    f"SELECT signature FROM entries WHERE signature IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ))
+            entries = []
+            try:
+                for signature, result in results:
+                    if signature in known or result is None:
+                        continue
+                    known.add(signature)
+                    if self.segments[self.active] >= self.segment_bytes:
+                        self._rotate()
+                    self._open_writer()
+                    payload = zlib.compress(json_dumps(result), self.compression_level)
+                    key = signature.encode()
+                    self.writer.write(RECORD_HEADER.pack(len(payload), len(key)) + key + payload)
+                    offset = self.segments[self.active] + RECORD_HEADER.size + len(key)
+                    entries.append((signature, self.active, offset, len(payload)))
+                    self.segments[self.active] = offset + len(payload)
+                # Data reaches the segment before the index points at it
+                if self.writer is not None:
+                    self.writer.flush()
+            except OSError as e:
+                print(f"Error writing transaction cache: {e}")
+            finally:
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO entries (signature, segment, offset, length) "
+                        "VALUES (?, ?, ?, ?)", entries
+                    )
+            self._evict()
+
+    def _rotate(self):
+        if self.segments[self.active] == 0:
+            return
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.active += 1
+        self.segments[self.active] = 0
+
+    def _evict(self):
+        while sum(self.segments.values()) > self.max_bytes and len(self.segments) > 1:
+            oldest = min(self.segments)
+            if oldest == self.active:
+                break
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE segment = ?", (oldest,))
+            try:
+                os.remove(self._segment_path(oldest))
+            except FileNotFoundError:
+                pass
+            del self.segments[oldest]
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream every cached ``(signature, result)``, oldest segment first."""
+        with self.lock:
+            if self.writer is not None:
+                self.writer.flush()
+            segments = sorted(self.segments)
+        for segment in segments:
+            try:
+                handle = open(self._segment_path(segment), 'rb')
+            except FileNotFoundError:
+                continue  # evicted meanwhile
+            with handle:
+                while True:
+                    header = handle.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    length, key_length = RECORD_HEADER.unpack(header)
+                    signature = handle.read(key_length).decode()
+                    payload = handle.read(length)
+                    if len(payload) < length:
+                        break  # torn write at the end of the active segment
+                    yield signature, json_loads(zlib.decompress(payload))
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Bytes used by segment files."""
+        return sum(self.segments.values())
+
+    def close(self):
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+            self.conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the transaction cache or reparse history from it")
+    parser.add_argument('command', choices=['stats', 'reparse'])
+    parser.add_argument('--directory', default="tx_cache", help="cache directory")
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        cache = TransactionCache(args.directory)
+        print(f"{len(cache)} transactions in {sum(1 for size in cache.segments.values() if size)} segments, "
+              f"{cache.size / 1024 ** 2:.1f} MiB")
+        cache.close()
+        return
+
+    from monitor import TransactionMonitor
+    import asyncio
+
+    async def run():
+        monitor = TransactionMonitor(cache_dir=args.directory)
+        try:
+            count = monitor.reparse_from_cache(
+                progress=lambda done: print(f"Reparsed {done} transactions")
+            )
+            print(f"Reparsed {count} transactions")
+        finally:
+            await monitor.close()
+
+    asyncio.run(run())
+
+if __name__ == '__main__':
+    main()
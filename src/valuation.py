@@ -0,0 +1,156 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from services import PriceTracker, TokenRegistry
+
+# Price id of native SOL in the price API
+SOL_PRICE_ID = "solana"
+# Span of one price history request; the API returns hourly points for
+# ranges up to 90 days
+HISTORY_WINDOW = 89 * 86400
+
+class Valuator:
+    """Annotates parsed transactions with token symbols and USD values.
+
+    Works on a whole batch at once: the distinct mints of the batch are
+    resolved through the ``TokenRegistry`` and each (price id, time bucket)
+    pair is priced once, then memoized. Prices for the current bucket are
+    read through ``PriceTracker.get_quote``, which never waits on the
+    network and queues a background refresh for missing or stale quotes.
+    Older buckets are priced from ``price_history``, fetched per token in
+    fixed ``HISTORY_WINDOW`` spans and memoized for every bucket of the
+    span, so a backfill over months costs a few range calls per token no
+    matter how it is batched. Valuation runs on its own single worker thread
+    (``executor``), so a slow or rate-limited price API never holds up
+    polling.
+    """
+
+    def __init__(self, registry: TokenRegistry, prices: PriceTracker, bucket_seconds: int = 3600,
+                 max_memo: int = 200_000):
+        self.registry = registry
+        self.prices = prices
+        self.bucket_seconds = bucket_seconds
+        self.max_memo = max_memo
+        self.memo: 'OrderedDict[Tuple[str, int], Optional[float]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="valuation")
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _remember(self, key: Tuple[str, int], price: Optional[float]):
+        with self.lock:
+            self.memo[key] = price
+            self.memo.move_to_end(key)
+            while len(self.memo) > self.max_memo:
+                self.memo.popitem(last=False)
+
+    def _nearest(self, points: List[Tuple[float, float]], timestamps: List[float],
+                 timestamp: float) -> Optional[float]:
+        index = bisect_left(timestamps, timestamp)
+        candidates = [i for i in (index - 1, index) if 0 <= i < len(points)]
+        if not candidates:
+            return None
+        closest = min(candidates, key=lambda i: abs(timestamps[i] - timestamp))
+        # Too far from any price point means the token had no price then
+        if abs(timestamps[closest] - timestamp) > 2 * 86400:
+            return None
+        return points[closest][1]
+
+    def _resolve_history(self, past: Dict[str, Set[int]], current: int) -> Set[str]:
+        """Memoize past bucket prices; returns the price ids whose history could not be fetched."""
+        failed = set()
+        for price_id, buckets in past.items():
+            windows = sorted({bucket * self.bucket_seconds // HISTORY_WINDOW for bucket in buckets})
+            for window in windows:
+                start = window * HISTORY_WINDOW
+                end = min(start + HISTORY_WINDOW, current * self.bucket_seconds)
+                points = self.prices.price_history(price_id, start, end)
+                if points is None:
+                    # Failed or rate limited; the caller retries later
+                    failed.add(price_id)
+                    continue
+                timestamps = [point[0] for point in points]
+                for bucket in range(start // self.bucket_seconds, min(end // self.bucket_seconds + 1, current)):
+                    middle = (bucket + 0.5) * self.bucket_seconds
+                    self._remember((price_id, bucket), self._nearest(points, timestamps, middle))
+        return failed
+
+    def _price(self, price_id: str, bucket: int, current: int, missing: Set[str]) -> Optional[float]:
+        if bucket >= current:
+            quote = self.prices.get_quote(price_id)
+            if quote is None:
+                missing.add(price_id)
+                return None
+            return quote.price
+        with self.lock:
+            return self.memo.get((price_id, bucket))
+
+    def value_transactions(self, transactions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Set[str]]:
+        """Add ``symbol``/``value_usd`` to transfers and ``total_value_usd`` to transactions, in place.
+
+        Blocks on price history lookups, so call it on ``executor``. Returns the
+        transactions that were changed and the price ids still without a
+        price: no current quote yet (a refresh has been queued) or a failed
+        history lookup. A later call can fill those in.
+        """
+        changed, missing = [], set()
+        if not transactions:
+            return changed, missing
+        try:
+            now = time.time()
+            current = self._bucket(now)
+            mints = {transfer['mint'] for tx in transactions
+                     for transfer in tx.get('token_transfers') or () if transfer.get('mint')}
+            tokens = {mint: self.registry.get_token_info(mint) for mint in mints}
+
+            past: Dict[str, Set[int]] = {}
+            buckets = []
+            for tx in transactions:
+                block_time = tx.get('block_time')
+                bucket = min(self._bucket(block_time if block_time is not None else now), current)
+                buckets.append(bucket)
+                if bucket >= current:
+                    continue
+                price_ids = [tokens[transfer['mint']].coingecko_id
+                             for transfer in tx.get('token_transfers') or () if transfer.get('mint')]
+                if tx.get('sol_transfer'):
+                    price_ids.append(SOL_PRICE_ID)
+                for price_id in price_ids:
+                    if price_id and (price_id, bucket) not in self.memo:
+                        past.setdefault(price_id, set()).add(bucket)
+            if past:
+                missing.update(self._resolve_history(past, current))
+
+            for tx, bucket in zip(transactions, buckets):
+                total = None
+                before = tx.get('total_value_usd')
+                for transfer in tx.get('token_transfers') or ():
+                    token = tokens.get(transfer.get('mint'))
+                    if token is None:
+                        continue
+                    if token.symbol:
+                        transfer['symbol'] = token.symbol
+                    price = (self._price(token.coingecko_id, bucket, current, missing)
+                             if token.coingecko_id else None)
+                    if price is not None:
+                        transfer['value_usd'] = abs(transfer['amount']) * price
+                        total = (total or 0.0) + transfer['value_usd']
+                if tx.get('sol_transfer'):
+                    price = self._price(SOL_PRICE_ID, bucket, current, missing)
+                    if price is not None:
+                        tx['sol_value_usd'] = abs(tx['sol_transfer']) * price
+                        total = (total or 0.0) + tx['sol_value_usd']
+                if total is not None:
+                    tx['total_value_usd'] = total
+                if total != before or any(transfer.get('symbol') for transfer in tx.get('token_transfers') or ()):
+                    changed.append(tx)
+        except Exception as e:
+            print(f"Error valuing transactions: {e}")
+        return changed, missing
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
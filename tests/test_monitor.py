@@ -0,0 +1,51 @@
+import asyncio
+
+from mock_rpc import DEFAULT_WALLET, MockRpcProcess
+from monitor import TransactionMonitor
+
+async def _push(monitor: TransactionMonitor, url: str, count: int):
+    response = await monitor.pool.http.post(url, json={"jsonrpc": "2.0", "id": 0, "method": "mock_push",
+                                                       "params": [DEFAULT_WALLET, count]})
+    return response.json()['result']['signatures']
+
+def test_gap_holds_the_cursor_and_later_transactions_are_stored(tmp_path, monkeypatch):
+    # The monitor keeps its history and cursors in the working directory
+    monkeypatch.chdir(tmp_path)
+    with MockRpcProcess(transactions=10) as url:
+        async def run():
+            monitor = TransactionMonitor(endpoints=[url], cache_dir=None)
+            monitor.add_wallet(DEFAULT_WALLET)
+            try:
+                # The first poll sets the cursor on the newest existing transaction
+                await monitor._poll_wallet(DEFAULT_WALLET)
+                assert monitor.cursors.get(DEFAULT_WALLET) is not None
+
+                pushed = await _push(monitor, url, 5)
+                missing = pushed[1]
+                failing = {missing}
+                requested = []
+                fetch = monitor.fetcher.fetch_transactions
+
+                async def fetch_with_failures(signatures):
+                    requested.append(list(signatures))
+                    results = await fetch(signatures)
+                    return [None if sig in failing else tx for sig, tx in zip(signatures, results)]
+
+                monitor.fetcher.fetch_transactions = fetch_with_failures
+                await monitor._poll_wallet(DEFAULT_WALLET)
+                stored = monitor.history.backend.contains_many(pushed)
+                assert stored == set(pushed) - {missing}
+                # The cursor stays before the gap so the next poll sees it again
+                assert monitor.cursors.get(DEFAULT_WALLET)['signature'] == pushed[0]
+
+                failing.clear()
+                requested.clear()
+                await monitor._poll_wallet(DEFAULT_WALLET)
+                assert monitor.history.backend.contains_many(pushed) == set(pushed)
+                # Only the missing one is fetched again, and the cursor moves past it
+                assert requested == [[missing]]
+                assert monitor.cursors.get(DEFAULT_WALLET)['signature'] == pushed[-1]
+            finally:
+                await monitor.close()
+
+        asyncio.run(run())
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from ratelimit import PRIORITY_BACKFILL, PRIORITY_LIVE, PRIORITY_METADATA, RateLimiter, RateLimits
+
+def _elapsed(coroutine) -> float:
+    started = time.monotonic()
+    asyncio.run(coroutine)
+    return time.monotonic() - started
+
+def test_single_calls_are_held_to_the_rate():
+    limiter = RateLimiter(50.0, burst=1)
+
+    async def run():
+        for _ in range(26):
+            await limiter.acquire()
+
+    # The first call uses the burst, the other 25 are paid at 50/s
+    assert _elapsed(run()) >= 25 / 50 * 0.95
+
+def test_batched_calls_are_each_counted():
+    # Batches larger than the bucket must not be clamped to its size
+    limiter = RateLimiter(200.0)
+
+    async def run():
+        for _ in range(6):
+            await limiter.acquire(100)
+
+    # 600 calls at 200/s with a 200 call burst
+    assert _elapsed(run()) >= (600 - 200) / 200 * 0.95
+
+def test_batch_debt_delays_the_next_request():
+    limits = RateLimits(10.0)
+
+    async def run():
+        await limits.acquire("endpoint", "getTransaction", 30)
+        started = time.monotonic()
+        await limits.acquire("endpoint", "getTransaction", 1)
+        return time.monotonic() - started
+
+    # 30 calls against a bucket of 10: 20 owed plus 1 for the next call, at 10/s
+    assert asyncio.run(run()) >= 2.0
+
+def test_waiters_are_served_in_priority_order():
+    limiter = RateLimiter(100.0, burst=1)
+    served = []
+
+    async def request(priority, name):
+        await limiter.acquire(1, priority)
+        served.append(name)
+
+    async def run():
+        await limiter.acquire()  # empty the bucket so everything below queues
+        await asyncio.gather(
+            request(PRIORITY_METADATA, "metadata"),
+            request(PRIORITY_BACKFILL, "backfill"),
+            request(PRIORITY_LIVE, "live 1"),
+            request(PRIORITY_LIVE, "live 2"),
+        )
+
+    asyncio.run(run())
+    assert served == ["live 1", "live 2", "backfill", "metadata"]
+
+def test_backoff_honours_retry_after_and_halves_the_rate():
+    limiter = RateLimiter(100.0)
+
+    async def run():
+        limiter.backoff(retry_after=0.3)
+        assert limiter.rate == pytest.approx(50.0)
+        await limiter.acquire()
+
+    assert _elapsed(run()) >= 0.3 * 0.95
+
+def test_backoff_does_not_forgive_a_batch_debt():
+    limiter = RateLimiter(10.0)
+
+    async def run():
+        await limiter.acquire(20)
+        limiter.backoff(retry_after=0.0)
+        await limiter.acquire()
+
+    # 10 owed, then 1 more, at the halved rate of 5/s
+    assert _elapsed(run()) >= 11 / 5 * 0.95
@@ -0,0 +1,77 @@
+import pytest
+
+from rollups import DAY, HOUR, SummaryRollups
+from storage import SQLiteBackend
+from timeindex import TimeIndex
+
+# A Monday 00:00 UTC, so day and hour boundaries are easy to hit exactly
+NOW = 1_700_438_400
+TYPES = ("Swap", "Transfer", "Unknown")
+
+def _transaction(i: int, ts: float) -> dict:
+    return {
+        'signature': f"sig-{i}",
+        'block_time': ts,
+        'total_value_usd': float(i % 17) + 0.5,
+        'transaction_type': TYPES[i % len(TYPES)],
+        'actions': [{'type': 'received' if i % 2 else 'sent', 'token_symbol': 'SOL',
+                     'amount_change': 1.0, 'value_usd': float(i % 17) + 0.5}],
+    }
+
+def _timestamps(now: float):
+    times = []
+    for days in (1, 7, 30, 90):
+        cutoff = now - days * DAY
+        # Exactly on, just before and just after each cutoff
+        times += [cutoff, cutoff - 1, cutoff + 1, cutoff + 0.5]
+    for offset in range(0, 100 * DAY, 7919):
+        times.append(NOW - offset)
+    # Every hour and day boundary in the last few days
+    times += [NOW - k * HOUR for k in range(0, 24 * 4)]
+    times += [NOW - k * DAY for k in range(0, 95)]
+    return sorted(times)
+
+def _naive(transactions, cutoff):
+    included = [tx for tx in transactions if tx['block_time'] > cutoff]
+    types = {}
+    for tx in included:
+        types[tx['transaction_type']] = types.get(tx['transaction_type'], 0) + 1
+    return len(included), sum(tx['total_value_usd'] for tx in included), types
+
+@pytest.mark.parametrize("now", [NOW, NOW - 1234.5, NOW - 7 * HOUR])
+def test_rollup_totals_match_a_naive_scan(tmp_path, now):
+    transactions = [_transaction(i, ts) for i, ts in enumerate(_timestamps(now))]
+    backend = SQLiteBackend(str(tmp_path / "history.db"))
+    backend.append(transactions)
+    rollups = SummaryRollups(backend)
+    index = TimeIndex(transactions)
+
+    for days in (1, 7, 30, 90):
+        cutoff = now - days * DAY
+        summary = rollups.summarize(cutoff, index.between_exclusive)
+        count, volume, types = _naive(transactions, cutoff)
+        assert summary['count'] == count, days
+        assert summary['volume_usd'] == pytest.approx(volume), days
+        assert summary['types'] == types, days
+    backend.close()
+
+def test_rollups_reload_from_the_backend(tmp_path):
+    path = str(tmp_path / "history.db")
+    transactions = [_transaction(i, ts) for i, ts in enumerate(_timestamps(NOW))]
+    backend = SQLiteBackend(path)
+    backend.append(transactions[:len(transactions) // 2])
+    rollups = SummaryRollups(backend)
+    rollups.flush()
+    # Stored after the last flush, so they have to be replayed on load
+    backend.append(transactions[len(transactions) // 2:])
+    backend.close()
+
+    backend = SQLiteBackend(path)
+    reloaded = SummaryRollups(backend)
+    index = TimeIndex(transactions)
+    for days in (1, 7, 30, 90):
+        cutoff = NOW - days * DAY
+        count, volume, _ = _naive(transactions, cutoff)
+        summary = reloaded.summarize(cutoff, index.between_exclusive)
+        assert (summary['count'], summary['volume_usd']) == (count, pytest.approx(volume))
+    backend.close()
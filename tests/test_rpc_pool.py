@@ -0,0 +1,85 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from mock_rpc import MockRpcProcess
+from rpc_pool import RpcError, RpcPool
+
+SIGNATURE_PARAMS = ["1" * 64, {"encoding": "json"}]
+
+def _closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+async def _stats(pool: RpcPool, url: str):
+    response = await pool.http.post(url, json={"jsonrpc": "2.0", "id": 0, "method": "mock_stats", "params": []})
+    return response.json()['result']
+
+def test_failover_avoids_an_erroring_endpoint():
+    with MockRpcProcess(transactions=1, error_ratio=1.0) as bad, MockRpcProcess(transactions=1) as good:
+        async def run():
+            pool = RpcPool([bad, good])
+            try:
+                for _ in range(20):
+                    assert 'result' in await pool.request("getTransaction", SIGNATURE_PARAMS)
+                assert pool.ranked()[0].url == good
+                return (await _stats(pool, bad))['errors'], (await _stats(pool, good))['counts']
+            finally:
+                await pool.close()
+
+        errors, counts = asyncio.run(run())
+        # One HTTP 500 is enough to rank it last
+        assert errors == 1
+        assert counts['getTransaction'] == 20
+
+def test_failover_on_transport_error():
+    with MockRpcProcess(transactions=1) as good:
+        async def run():
+            dead = _closed_port_url()
+            pool = RpcPool([dead, good])
+            try:
+                assert 'result' in await pool.request("getTransaction", SIGNATURE_PARAMS)
+                assert list(pool.stats[dead].outcomes) == [False]
+            finally:
+                await pool.close()
+
+        asyncio.run(run())
+
+def test_all_endpoints_failing_raises():
+    async def run():
+        pool = RpcPool([_closed_port_url(), _closed_port_url()])
+        try:
+            with pytest.raises(RpcError):
+                await pool.request("getTransaction", SIGNATURE_PARAMS)
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+def test_hedge_cancels_the_slow_endpoint():
+    with MockRpcProcess(transactions=1, latency=2.0) as slow, MockRpcProcess(transactions=1) as fast:
+        async def run():
+            pool = RpcPool([slow, fast], default_hedge_delay=0.1)
+            try:
+                started = time.monotonic()
+                # Both untried, so the slow endpoint is the primary and the fast one the hedge
+                assert 'result' in await pool.request("getTransaction", SIGNATURE_PARAMS, hedge=True)
+                slow_stats, fast_stats = pool.stats[slow], pool.stats[fast]
+                # The cancelled primary is neither a success nor an error, only slower than the winner
+                assert not slow_stats.outcomes
+                assert len(slow_stats.latencies) == 1 and slow_stats.latencies[0] >= 0.1
+                assert list(fast_stats.outcomes) == [True]
+                assert pool.ranked()[0].url == fast
+
+                for _ in range(4):
+                    assert 'result' in await pool.request("getTransaction", SIGNATURE_PARAMS, hedge=True)
+                # No request waited for the slow endpoint to answer
+                assert time.monotonic() - started < 2.0
+                assert not slow_stats.outcomes
+            finally:
+                await pool.close()
+
+        asyncio.run(run())
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from mock_rpc import DEFAULT_WALLET, MockWebsocket
+from subscriber import SubscriptionManager
+
+async def _run_for(manager: SubscriptionManager, seconds: float):
+    task = asyncio.create_task(manager.run())
+    await asyncio.sleep(seconds)
+    manager.stop()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+def _manager(server: MockWebsocket, statuses, **options) -> SubscriptionManager:
+    manager = SubscriptionManager(server.url, lambda wallet: None, account_updates=True,
+                                  on_status=lambda up: statuses.append((up, time.monotonic())),
+                                  reconnect_delay=0.1, **options)
+    manager.add(DEFAULT_WALLET)
+    return manager
+
+def test_connected_only_once_subscriptions_are_acknowledged():
+    server = MockWebsocket(ack_delay=0.3)
+    statuses = []
+    try:
+        started = time.monotonic()
+        manager = _manager(server, statuses)
+        asyncio.run(_run_for(manager, 1.0))
+        assert statuses[0][0] is True
+        # Two subscriptions (logs and account), each acknowledged 0.3 s late
+        assert statuses[0][1] - started >= 0.6
+        assert sorted(method for _, method in manager.subscriptions.values()) == \
+            ['accountSubscribe', 'logsSubscribe']
+    finally:
+        server.close()
+
+def test_rejected_subscription_is_not_reported_as_connected():
+    server = MockWebsocket(reject=True)
+    statuses = []
+    try:
+        asyncio.run(_run_for(_manager(server, statuses), 0.5))
+        assert not any(up for up, _ in statuses)
+        # and the connection is retried
+        assert server.stats()['connections'] >= 2
+    finally:
+        server.close()
+
+def test_unacknowledged_subscription_times_out():
+    server = MockWebsocket(ack_delay=1.0)
+    statuses = []
+    try:
+        asyncio.run(_run_for(_manager(server, statuses, subscribe_timeout=0.2), 0.6))
+        assert not any(up for up, _ in statuses)
+        assert server.stats()['connections'] >= 2
+    finally:
+        server.close()